@@ -0,0 +1,33 @@
+"""
+SQLite backend tuned for concurrent web traffic.
+
+Every new connection gets ``ecommerce_project.database.SQLITE_PRAGMAS``
+(WAL, busy timeout, mmap, ...). They run on the raw sqlite3 connection
+before Django wraps it, so they never show up in query counts.
+
+Transactions start with ``BEGIN IMMEDIATE``. Django 4.2 opens transactions
+with a plain (deferred) ``BEGIN``. A deferred transaction that reads before
+it writes -- checkout, cart updates -- has to upgrade its lock
+mid-transaction, and when another connection is writing SQLite fails that
+upgrade with "database is locked" at once instead of waiting out
+``busy_timeout``. Taking the write lock up front makes writers queue on the
+busy timeout instead (Django 5.1's ``transaction_mode``).
+"""
+from django.db.backends.sqlite3 import base
+
+from ecommerce_project.database import sqlite_pragmas
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = sqlite_pragmas()
+        if self.is_in_memory_db():
+            # In-memory databases have no journal file to switch to WAL.
+            pragmas = {k: v for k, v in pragmas.items() if k != 'journal_mode'}
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,97 @@
+"""
+Read-replica routing.
+
+Reads go to the primary (``default``) unless a view opts in with
+``@read_replica``; within such a view, reads are spread over the aliases in
+``settings.DATABASE_REPLICAS``. Writes always go to the primary.
+
+To make sure people see their own writes despite replication lag,
+``store.middleware.ReplicaRoutingMiddleware`` pins a browser to the primary
+for ``DATABASE_REPLICA_STICKY_SECONDS`` after any request that wrote to the
+database (add to cart, checkout, profile update, ...).
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Apps whose rows must always be read from the primary: sessions are read on
+# every request right after being written, tasks are claimed with UPDATEs.
+PRIMARY_ONLY_APPS = {'sessions', 'tasks'}
+
+
+class RoutingState:
+    """Per-request routing flags, shared by the middleware and the router."""
+
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+_replica_reads = ContextVar('db_replica_reads', default=False)
+
+
+def begin_request(pinned=False):
+    """Start tracking writes for a request; returns the state and a reset token."""
+    state = RoutingState(pinned)
+    return state, _state.set(state)
+
+
+def end_request(token):
+    _state.reset(token)
+
+
+def read_replica(view_func):
+    """Let the reads made by ``view_func`` use a read replica."""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped(*args, **kwargs):
+            token = _replica_reads.set(True)
+            try:
+                return await view_func(*args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+    else:
+        @wraps(view_func)
+        def _wrapped(*args, **kwargs):
+            token = _replica_reads.set(True)
+            try:
+                return view_func(*args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+    return _wrapped
+
+
+class ReplicaRouter:
+    """Send opted-in reads to a replica and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if not replicas or not _replica_reads.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction must see its uncommitted writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        pool = {DEFAULT_DB_ALIAS, *getattr(settings, 'DATABASE_REPLICAS', ())}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
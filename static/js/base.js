@@ -0,0 +1,247 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Navbar scroll effect
+    window.addEventListener('scroll', function() {
+        const navbar = document.getElementById('mainNavbar');
+        if (window.scrollY > 50) {
+            navbar.classList.add('scrolled');
+        } else {
+            navbar.classList.remove('scrolled');
+        }
+    });
+
+    // Scroll to top functionality
+    const scrollTopBtn = document.getElementById('scrollTop');
+
+    window.addEventListener('scroll', function() {
+        if (window.scrollY > 300) {
+            scrollTopBtn.classList.add('visible');
+        } else {
+            scrollTopBtn.classList.remove('visible');
+        }
+    });
+
+    scrollTopBtn.addEventListener('click', function() {
+        window.scrollTo({
+            top: 0,
+            behavior: 'smooth'
+        });
+    });
+
+    // Add loading state to buttons
+    document.querySelectorAll('.btn-primary').forEach(button => {
+        button.addEventListener('click', function(e) {
+            if (!this.classList.contains('loading')) {
+                this.classList.add('loading');
+                const originalText = this.innerHTML;
+                this.innerHTML = '<span class="loading-spinner"></span> Adding...';
+
+                setTimeout(() => {
+                    this.classList.remove('loading');
+                    this.innerHTML = originalText;
+                }, 2000);
+            }
+        });
+    });
+
+    // Enhanced card interactions with sound effects
+    document.querySelectorAll('.product-card').forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-20px) scale(1.05) rotateY(5deg)';
+            this.style.boxShadow = 'var(--shadow-glow)';
+
+            // Add ripple effect
+            const ripple = document.createElement('div');
+            ripple.style.cssText = `
+                position: absolute;
+                border-radius: 50%;
+                background: rgba(131, 56, 236, 0.3);
+                transform: scale(0);
+                animation: ripple 0.6s linear;
+                pointer-events: none;
+                top: 50%;
+                left: 50%;
+                width: 100px;
+                height: 100px;
+                margin-top: -50px;
+                margin-left: -50px;
+            `;
+            this.appendChild(ripple);
+            setTimeout(() => ripple.remove(), 600);
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0) scale(1) rotateY(0deg)';
+            this.style.boxShadow = 'var(--shadow-soft)';
+        });
+    });
+
+    // Add ripple animation
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes ripple {
+            to {
+                transform: scale(4);
+                opacity: 0;
+            }
+        }
+    `;
+    document.head.appendChild(style);
+
+    // Auto-dismiss alerts after 5 seconds
+    document.querySelectorAll('.alert').forEach(alert => {
+        setTimeout(() => {
+            if (alert.classList.contains('show')) {
+                const bsAlert = new bootstrap.Alert(alert);
+                bsAlert.close();
+            }
+        }, 5000);
+    });
+
+    // Initialize cart count on page load
+    updateCartCount();
+
+    // Interactive background that follows mouse
+    const interactiveBg = document.createElement('div');
+    interactiveBg.className = 'interactive-bg';
+    document.body.appendChild(interactiveBg);
+
+    document.addEventListener('mousemove', (e) => {
+        const x = (e.clientX / window.innerWidth) * 100;
+        const y = (e.clientY / window.innerHeight) * 100;
+        interactiveBg.style.setProperty('--mouse-x', x + '%');
+        interactiveBg.style.setProperty('--mouse-y', y + '%');
+    });
+
+    // Add glow effect to buttons
+    document.querySelectorAll('.btn-primary').forEach(btn => {
+        btn.classList.add('glow-effect');
+    });
+
+    // Celebration effect for successful actions
+    function createCelebration(element) {
+        const colors = ['#ff006e', '#8338ec', '#3a86ff', '#ffd60a', '#06ffa5'];
+        for (let i = 0; i < 15; i++) {
+            const confetti = document.createElement('div');
+            confetti.style.cssText = `
+                position: fixed;
+                width: 10px;
+                height: 10px;
+                background: ${colors[Math.floor(Math.random() * colors.length)]};
+                left: ${element.getBoundingClientRect().left + element.offsetWidth/2}px;
+                top: ${element.getBoundingClientRect().top}px;
+                border-radius: 50%;
+                pointer-events: none;
+                z-index: 9999;
+                animation: confetti-fall 1s ease-out forwards;
+            `;
+            document.body.appendChild(confetti);
+            setTimeout(() => confetti.remove(), 1000);
+        }
+    }
+
+    // Add confetti animation
+    const confettiStyle = document.createElement('style');
+    confettiStyle.textContent = `
+        @keyframes confetti-fall {
+            0% {
+                transform: translateY(0) rotate(0deg);
+                opacity: 1;
+            }
+            100% {
+                transform: translateY(200px) rotate(720deg);
+                opacity: 0;
+            }
+        }
+    `;
+    document.head.appendChild(confettiStyle);
+});
+
+// Global cart management functions
+function updateCartCount() {
+    fetch('/api/cart/?summary=1')
+    .then(response => response.json())
+    .then(data => {
+        const cartLink = document.getElementById('cartLink');
+        if (cartLink) {
+            cartLink.setAttribute('data-count', data.cart_count);
+        }
+    })
+    .catch(error => console.log('Error updating cart count:', error));
+}
+
+function addToCart(productId, quantity = 1) {
+    fetch(`/add/${productId}/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': getCookie('csrftoken'),
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        body: `quantity=${quantity}`
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            updateCartCount();
+            showGlobalNotification(data.message, 'success');
+
+            // Enhanced cart icon animation
+            const cartIcon = document.querySelector('.cart-icon');
+            if (cartIcon) {
+                cartIcon.style.transform = 'scale(1.3) rotate(10deg)';
+                cartIcon.style.color = '#43e97b';
+                cartIcon.style.textShadow = '0 0 10px #43e97b';
+
+                // Create celebration effect
+                createCelebration(cartIcon);
+
+                setTimeout(() => {
+                    cartIcon.style.transform = 'scale(1) rotate(0deg)';
+                    cartIcon.style.color = '';
+                    cartIcon.style.textShadow = '';
+                }, 500);
+            }
+        } else {
+            showGlobalNotification('Failed to add item to cart', 'error');
+        }
+    })
+    .catch(error => {
+        showGlobalNotification('Error adding item to cart', 'error');
+    });
+}
+
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+function showGlobalNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+    notification.style.cssText = 'top: 100px; right: 20px; z-index: 9999; min-width: 300px; animation: slideInRight 0.5s ease; border-radius: 15px;';
+    notification.innerHTML = `
+        <i class="fas fa-${type === 'success' ? 'check-circle' : type === 'error' ? 'exclamation-circle' : type === 'warning' ? 'exclamation-triangle' : 'info-circle'} me-2"></i>
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+
+    document.body.appendChild(notification);
+
+    setTimeout(() => {
+        if (notification.parentNode) {
+            notification.style.animation = 'slideOutRight 0.5s ease';
+            setTimeout(() => notification.remove(), 500);
+        }
+    }, 4000);
+}
+
@@ -0,0 +1,125 @@
+function updateQuantity(itemId, change) {
+    const quantityElement = document.getElementById(`quantity-${itemId}`);
+    let currentQuantity = parseInt(quantityElement.textContent);
+    let newQuantity = currentQuantity + change;
+
+    if (newQuantity < 1) {
+        if (confirm('Remove this item from cart?')) {
+            removeItemById(itemId);
+        }
+        return;
+    }
+
+    // Update UI immediately
+    quantityElement.textContent = newQuantity;
+
+    // Make AJAX request
+    fetch(`/add/${getProductIdFromItem(itemId)}/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': getCookie('csrftoken'),
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        body: `quantity=${change > 0 ? 1 : -1}`
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            updateCartTotals();
+            showNotification(data.message, 'success');
+        } else {
+            // Revert UI change
+            quantityElement.textContent = currentQuantity;
+            showNotification('Failed to update cart', 'error');
+        }
+    })
+    .catch(error => {
+        // Revert UI change
+        quantityElement.textContent = currentQuantity;
+        showNotification('Error updating cart', 'error');
+    });
+}
+
+function removeItem(productId) {
+    if (!confirm('Are you sure you want to remove this item?')) {
+        return;
+    }
+
+    fetch(`/remove/${productId}/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': getCookie('csrftoken'),
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload(); // Reload to update the cart display
+        } else {
+            showNotification('Failed to remove item', 'error');
+        }
+    })
+    .catch(error => {
+        showNotification('Error removing item', 'error');
+    });
+}
+
+function updateCartTotals() {
+    fetch('/api/cart/?summary=1')
+    .then(response => response.json())
+    .then(data => {
+        document.getElementById('subtotal').textContent = `$${data.cart_total.toFixed(2)}`;
+        document.getElementById('tax').textContent = `$${(data.cart_total * 0.1).toFixed(2)}`;
+        document.getElementById('grand-total').textContent = `$${(data.cart_total * 1.1).toFixed(2)}`;
+
+        // Update navbar cart count
+        const cartBadge = document.querySelector('.cart-icon::after');
+        if (cartBadge) {
+            cartBadge.textContent = data.cart_count;
+        }
+    });
+}
+
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+    notification.style.cssText = 'top: 100px; right: 20px; z-index: 9999; min-width: 300px; animation: slideInRight 0.5s ease;';
+    notification.innerHTML = `
+        <i class="fas fa-${type === 'success' ? 'check-circle' : 'exclamation-circle'} me-2"></i>
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+
+    document.body.appendChild(notification);
+
+    setTimeout(() => {
+        if (notification.parentNode) {
+            notification.remove();
+        }
+    }, 4000);
+}
+
+// Helper function to get product ID from item (you'll need to implement this based on your data structure)
+function getProductIdFromItem(itemId) {
+    // This is a placeholder - you'll need to store product IDs in data attributes
+    const itemElement = document.querySelector(`[data-item-id="${itemId}"]`);
+    return itemElement ? itemElement.dataset.productId : null;
+}
@@ -0,0 +1,13 @@
+document.getElementById('contactForm').addEventListener('submit', function(e) {
+    const button = this.querySelector('button[type="submit"]');
+    const originalText = button.innerHTML;
+
+    button.innerHTML = '<span class="loading-spinner"></span> Sending...';
+    button.disabled = true;
+
+    // Re-enable button after form submission (in case of validation errors)
+    setTimeout(() => {
+        button.innerHTML = originalText;
+        button.disabled = false;
+    }, 3000);
+});
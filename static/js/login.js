@@ -0,0 +1,30 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add focus effects to form inputs
+    document.querySelectorAll('.form-control').forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'translateY(-2px)';
+            const icon = this.parentElement.querySelector('.form-icon');
+            if (icon) {
+                icon.style.color = '#667eea';
+                icon.style.transform = 'translateY(-50%) scale(1.1)';
+            }
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'translateY(0)';
+            const icon = this.parentElement.querySelector('.form-icon');
+            if (icon) {
+                icon.style.color = '#667eea';
+                icon.style.transform = 'translateY(-50%) scale(1)';
+            }
+        });
+    });
+
+    // Social login buttons
+    document.querySelectorAll('.btn-social').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const platform = this.classList.contains('btn-google') ? 'Google' : 'Facebook';
+            showGlobalNotification(`${platform} login coming soon!`, 'info');
+        });
+    });
+});
@@ -0,0 +1,58 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add confetti effect
+    createConfetti();
+
+    // Auto-redirect after 30 seconds (optional)
+    setTimeout(() => {
+        if (confirm('Would you like to continue shopping?')) {
+            window.location.href = document.querySelector('.confirmation-container').dataset.shopUrl;
+        }
+    }, 30000);
+});
+
+function createConfetti() {
+    const colors = ['#43e97b', '#38f9d7', '#667eea', '#764ba2', '#f093fb', '#f5576c'];
+    const confettiContainer = document.createElement('div');
+    confettiContainer.style.cssText = `
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100%;
+        height: 100%;
+        pointer-events: none;
+        z-index: 1000;
+    `;
+    document.body.appendChild(confettiContainer);
+
+    for (let i = 0; i < 50; i++) {
+        const confetti = document.createElement('div');
+        confetti.style.cssText = `
+            position: absolute;
+            width: 10px;
+            height: 10px;
+            background: ${colors[Math.floor(Math.random() * colors.length)]};
+            top: -10px;
+            left: ${Math.random() * 100}%;
+            animation: confettiFall ${2 + Math.random() * 3}s linear forwards;
+            animation-delay: ${Math.random() * 2}s;
+        `;
+        confettiContainer.appendChild(confetti);
+    }
+
+    // Remove confetti after animation
+    setTimeout(() => {
+        confettiContainer.remove();
+    }, 5000);
+}
+
+// Add confetti animation CSS
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes confettiFall {
+        to {
+            transform: translateY(100vh) rotate(360deg);
+            opacity: 0;
+        }
+    }
+`;
+document.head.appendChild(style);
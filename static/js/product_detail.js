@@ -0,0 +1,237 @@
+// Product details rendered by the template (see .product-detail-container)
+const productData = document.querySelector('.product-detail-container').dataset;
+
+// Quantity controls
+function increaseQuantity() {
+    const input = document.getElementById('quantity');
+    const currentValue = parseInt(input.value);
+    const maxValue = parseInt(input.getAttribute('max'));
+
+    if (currentValue < maxValue) {
+        input.value = currentValue + 1;
+        animateQuantityChange();
+    }
+}
+
+function decreaseQuantity() {
+    const input = document.getElementById('quantity');
+    const currentValue = parseInt(input.value);
+    const minValue = parseInt(input.getAttribute('min'));
+
+    if (currentValue > minValue) {
+        input.value = currentValue - 1;
+        animateQuantityChange();
+    }
+}
+
+function animateQuantityChange() {
+    const input = document.getElementById('quantity');
+    input.style.transform = 'scale(1.1)';
+    input.style.background = 'rgba(102, 126, 234, 0.1)';
+
+    setTimeout(() => {
+        input.style.transform = 'scale(1)';
+        input.style.background = 'white';
+    }, 200);
+}
+
+// Enhanced Add to Cart functionality
+function addProductToCart() {
+    const quantity = parseInt(document.getElementById('quantity').value);
+    const btn = document.getElementById('addToCartBtn');
+    const originalContent = btn.innerHTML;
+
+    // Add loading state
+    btn.classList.add('loading');
+    btn.innerHTML = '<span class="loading-spinner"></span> Adding to Cart...';
+    btn.disabled = true;
+
+    // Use global addToCart function
+    fetch(productData.addUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': getCookie('csrftoken'),
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        body: `quantity=${quantity}`
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Success state
+            btn.innerHTML = '<i class="fas fa-check me-2"></i>Added Successfully!';
+            btn.style.background = 'linear-gradient(135deg, #43e97b 0%, #38f9d7 100%)';
+
+            // Show success notification
+            showNotification('🎉 Product added to cart successfully!', 'success');
+
+            // Update cart count in navbar
+            updateCartCount();
+
+            // Reset button after 3 seconds
+            setTimeout(() => {
+                btn.classList.remove('loading');
+                btn.innerHTML = originalContent;
+                btn.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
+                btn.disabled = false;
+            }, 3000);
+        } else {
+            btn.classList.remove('loading');
+            btn.innerHTML = originalContent;
+            btn.disabled = false;
+            showNotification('Failed to add product to cart', 'error');
+        }
+    })
+    .catch(error => {
+        btn.classList.remove('loading');
+        btn.innerHTML = originalContent;
+        btn.disabled = false;
+        showNotification('Error adding product to cart', 'error');
+    });
+}
+
+// Image zoom functionality
+function zoomImage() {
+    const productImage = document.getElementById('productImage');
+    const zoomedImage = document.getElementById('zoomedImage');
+
+    if (productImage) {
+        zoomedImage.src = productImage.dataset.full || productImage.currentSrc || productImage.src;
+        const modal = new bootstrap.Modal(document.getElementById('imageZoomModal'));
+        modal.show();
+    }
+}
+
+// Share product functionality
+function shareProduct() {
+    if (navigator.share) {
+        navigator.share({
+            title: productData.productName,
+            text: productData.productDescription,
+            url: window.location.href
+        }).then(() => {
+            showNotification('Product shared successfully!', 'success');
+        }).catch((error) => {
+            console.log('Error sharing:', error);
+            fallbackShare();
+        });
+    } else {
+        fallbackShare();
+    }
+}
+
+function fallbackShare() {
+    // Copy URL to clipboard
+    navigator.clipboard.writeText(window.location.href).then(() => {
+        showNotification('Product URL copied to clipboard!', 'info');
+    }).catch(() => {
+        showNotification('Unable to share. Please copy the URL manually.', 'warning');
+    });
+}
+
+// Wishlist functionality
+document.querySelector('.btn-wishlist').addEventListener('click', function(e) {
+    e.preventDefault();
+
+    const icon = this.querySelector('i');
+    const text = this.querySelector('span') || this;
+
+    if (icon.classList.contains('far')) {
+        icon.classList.remove('far');
+        icon.classList.add('fas');
+        this.style.borderColor = '#f093fb';
+        this.style.color = '#f093fb';
+        showNotification('💖 Added to wishlist!', 'success');
+    } else {
+        icon.classList.remove('fas');
+        icon.classList.add('far');
+        this.style.borderColor = '#e9ecef';
+        this.style.color = '#6c757d';
+        showNotification('Removed from wishlist', 'info');
+    }
+});
+
+// Update cart count in navbar
+function updateCartCount() {
+    const cartIcon = document.querySelector('.cart-icon');
+    if (cartIcon) {
+        // Animate cart icon
+        cartIcon.style.transform = 'scale(1.2)';
+        cartIcon.style.color = '#43e97b';
+
+        setTimeout(() => {
+            cartIcon.style.transform = 'scale(1)';
+            cartIcon.style.color = '';
+        }, 300);
+    }
+}
+
+// Notification system
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+    notification.style.cssText = 'top: 100px; right: 20px; z-index: 9999; min-width: 300px; animation: slideInRight 0.5s ease;';
+    notification.innerHTML = `
+        <i class="fas fa-${type === 'success' ? 'check-circle' : type === 'warning' ? 'exclamation-triangle' : 'info-circle'} me-2"></i>
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+
+    document.body.appendChild(notification);
+
+    // Auto remove after 4 seconds
+    setTimeout(() => {
+        if (notification.parentNode) {
+            notification.style.animation = 'slideOutRight 0.5s ease';
+            setTimeout(() => notification.remove(), 500);
+        }
+    }, 4000);
+}
+
+// Enhanced image interactions
+document.addEventListener('DOMContentLoaded', function() {
+    const productImage = document.getElementById('productImage');
+
+    if (productImage) {
+        // Add magnifying glass cursor on hover
+        productImage.addEventListener('mouseenter', function() {
+            this.style.cursor = 'zoom-in';
+        });
+
+        // Click to zoom
+        productImage.addEventListener('click', zoomImage);
+    }
+
+    // Animate elements on scroll
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.animationPlayState = 'running';
+            }
+        });
+    }, observerOptions);
+
+    document.querySelectorAll('.product-detail-container > *').forEach(element => {
+        observer.observe(element);
+    });
+});
+
+// Add CSS animations for notifications
+const style = document.createElement('style');
+style.textContent = `
+    @keyframes slideInRight {
+        from { opacity: 0; transform: translateX(100px); }
+        to { opacity: 1; transform: translateX(0); }
+    }
+    @keyframes slideOutRight {
+        from { opacity: 1; transform: translateX(0); }
+        to { opacity: 0; transform: translateX(100px); }
+    }
+`;
+document.head.appendChild(style);
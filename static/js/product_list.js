@@ -0,0 +1,130 @@
+// Enhanced product interactions
+document.addEventListener('DOMContentLoaded', function() {
+    // Animate product cards on scroll
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.animationPlayState = 'running';
+            }
+        });
+    }, observerOptions);
+
+    document.querySelectorAll('.product-card').forEach(card => {
+        observer.observe(card);
+    });
+
+    // Enhanced sort functionality
+    document.querySelectorAll('[data-sort]').forEach(item => {
+        item.addEventListener('click', function(e) {
+            e.preventDefault();
+            const sortType = this.getAttribute('data-sort');
+
+            // Build URL with sort parameter
+            const currentUrl = new URL(window.location);
+            currentUrl.searchParams.set('sort', sortType);
+            currentUrl.searchParams.delete('cursor');
+
+            // Redirect to sorted URL
+            window.location.href = currentUrl.toString();
+        });
+    });
+
+    // Enhanced add to cart functionality
+    document.querySelectorAll('.btn-add-cart').forEach(button => {
+        button.addEventListener('click', function(e) {
+            e.preventDefault();
+
+            if (!this.classList.contains('loading')) {
+                this.classList.add('loading');
+                const originalContent = this.innerHTML;
+                this.innerHTML = '<span class="loading-spinner"></span> Adding...';
+
+                // Simulate add to cart
+                setTimeout(() => {
+                    this.classList.remove('loading');
+                    this.innerHTML = '<i class="fas fa-check me-1"></i>Added!';
+                    this.style.background = 'linear-gradient(135deg, #43e97b 0%, #38f9d7 100%)';
+
+                    // Show success notification
+                    showNotification('Product added to cart successfully!', 'success');
+
+                    // Reset button after 2 seconds
+                    setTimeout(() => {
+                        this.innerHTML = originalContent;
+                        this.style.background = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)';
+                    }, 2000);
+                }, 1500);
+            }
+        });
+    });
+
+    // Product card hover effects
+    document.querySelectorAll('.product-card').forEach(card => {
+        card.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateY(-15px) scale(1.02)';
+        });
+
+        card.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Category item animations
+    document.querySelectorAll('.category-item').forEach(item => {
+        item.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateX(10px)';
+        });
+
+        item.addEventListener('mouseleave', function() {
+            if (!this.classList.contains('active')) {
+                this.style.transform = 'translateX(0)';
+            }
+        });
+    });
+});
+
+// Notification system
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+    notification.style.cssText = 'top: 100px; right: 20px; z-index: 9999; min-width: 300px;';
+    notification.innerHTML = `
+        <i class="fas fa-${type === 'success' ? 'check-circle' : 'info-circle'} me-2"></i>
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+
+    document.body.appendChild(notification);
+
+    // Auto remove after 4 seconds
+    setTimeout(() => {
+        if (notification.parentNode) {
+            notification.remove();
+        }
+    }, 4000);
+}
+
+// Search functionality (if search input exists)
+const searchInput = document.querySelector('#productSearch');
+if (searchInput) {
+    searchInput.addEventListener('input', function() {
+        const searchTerm = this.value.toLowerCase();
+        const productCards = document.querySelectorAll('.product-card');
+
+        productCards.forEach(card => {
+            const title = card.querySelector('.product-title').textContent.toLowerCase();
+            const description = card.querySelector('.product-description').textContent.toLowerCase();
+
+            if (title.includes(searchTerm) || description.includes(searchTerm)) {
+                card.parentElement.style.display = 'block';
+            } else {
+                card.parentElement.style.display = 'none';
+            }
+        });
+    });
+}
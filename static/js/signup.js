@@ -0,0 +1,76 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Add focus effects to form inputs
+    document.querySelectorAll('.form-control').forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'translateY(-2px)';
+            const icon = this.parentElement.querySelector('.form-icon');
+            if (icon) {
+                icon.style.color = '#43e97b';
+                icon.style.transform = 'translateY(-50%) scale(1.1)';
+            }
+        });
+
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'translateY(0)';
+            const icon = this.parentElement.querySelector('.form-icon');
+            if (icon) {
+                icon.style.color = '#43e97b';
+                icon.style.transform = 'translateY(-50%) scale(1)';
+            }
+        });
+    });
+
+    // Password strength checker
+    const passwordInput = document.getElementById('password');
+    const strengthBar = document.getElementById('strengthBar');
+    const strengthText = document.getElementById('strengthText');
+
+    passwordInput.addEventListener('input', function() {
+        const password = this.value;
+        const strength = checkPasswordStrength(password);
+
+        strengthBar.className = 'strength-fill strength-' + strength.level;
+        strengthText.textContent = strength.text;
+    });
+
+    function checkPasswordStrength(password) {
+        let score = 0;
+
+        if (password.length >= 8) score++;
+        if (/[a-z]/.test(password)) score++;
+        if (/[A-Z]/.test(password)) score++;
+        if (/[0-9]/.test(password)) score++;
+        if (/[^A-Za-z0-9]/.test(password)) score++;
+
+        if (score < 2) return { level: 'weak', text: 'Weak' };
+        if (score < 3) return { level: 'fair', text: 'Fair' };
+        if (score < 4) return { level: 'good', text: 'Good' };
+        return { level: 'strong', text: 'Strong' };
+    }
+
+    // Social login buttons
+    document.querySelectorAll('.btn-social').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const platform = this.classList.contains('btn-google') ? 'Google' : 'Facebook';
+            showGlobalNotification(`${platform} signup coming soon!`, 'info');
+        });
+    });
+
+    // Form submission
+    document.getElementById('signupForm').addEventListener('submit', function(e) {
+        const password1 = document.querySelector('input[name="password1"]').value;
+        const password2 = document.querySelector('input[name="password2"]').value;
+
+        if (password1 !== password2) {
+            e.preventDefault();
+            showGlobalNotification('Passwords do not match!', 'error');
+            return;
+        }
+
+        if (password1.length < 8) {
+            e.preventDefault();
+            showGlobalNotification('Password must be at least 8 characters long!', 'error');
+            return;
+        }
+    });
+});
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Product, Order, OrderItem, Cart, CartItem
+from .models import Category, Product, Order, OrderItem, Cart, CartItem, StockReservation
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -8,9 +8,10 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'price', 'available', 'created', 'updated']
+    list_display = ['name', 'slug', 'price', 'available', 'stock', 'reserved', 'created', 'updated']
     list_filter = ['available', 'created', 'updated', 'category']
-    list_editable = ['price', 'available']
+    list_editable = ['price', 'available', 'stock']
+    readonly_fields = ['reserved']
     prepopulated_fields = {'slug': ('name',)}
 
 class OrderItemInline(admin.TabularInline):
@@ -26,4 +27,9 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline]
 
 admin.site.register(Cart)
-admin.site.register(CartItem)
\ No newline at end of file
+admin.site.register(CartItem)
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['product', 'cart', 'quantity', 'expires_at']
+    raw_id_fields = ['product', 'cart']
\ No newline at end of file
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+class StoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'store'
+
+    def ready(self):
+        # Register signal handlers (search index sync, etc.)
+        from . import checks, signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        from .metrics import instrument_connection
+        connection_created.connect(instrument_connection, dispatch_uid='store.instrument_connection')
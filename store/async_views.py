@@ -0,0 +1,149 @@
+"""
+Async versions of the JSON API and cart endpoints.
+
+Under ASGI these serve many concurrent (mostly I/O-bound) AJAX requests per
+worker instead of tying up one thread each. Reads use Django's async ORM;
+the pieces that are still synchronous in Django 4.2 -- session loads, the
+authenticated user lookup and transactions (cart mutations run inside
+``transaction.atomic``) -- go through ``sync_to_async``.
+
+They are routed instead of their ``store.views`` counterparts when
+``settings.ASYNC_VIEWS`` is set (see ``store/urls.py``).
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.shortcuts import redirect
+from ecommerce_project.routers import read_replica
+from .cache import acached_catalog
+from .cart import add_item, aget_cart, remove_item
+from .conditional import api_products_validators, conditional
+from .facets import FacetFilters, acategory_list, afacet_rows, build_facets, stock_cache_timeout
+from .inventory import OutOfStock
+from .models import Product
+from .pagination import InvalidCursor, KeysetPaginator, aestimate_count, get_page_size
+from .queries import query_budget
+from .views import SORT_ORDERINGS, api_products_payload
+
+async def _aget_product(product_id):
+    try:
+        return await Product.objects.aget(id=product_id)
+    except Product.DoesNotExist:
+        raise Http404('No Product matches the given query.')
+
+def _is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+@query_budget(6)
+@read_replica
+@conditional(api_products_validators)
+async def api_products(request):
+    """Async version of ``store.views.api_products``."""
+    categories = await acategory_list()
+    filters = FacetFilters.from_request(request, categories)
+    category_ids = filters.category_ids(categories)
+    sort_by = request.GET.get('sort', 'name')
+    if sort_by not in SORT_ORDERINGS or sort_by == 'relevance':
+        sort_by = 'name'
+    cursor = request.GET.get('cursor')
+    page_size = get_page_size(request)
+    include_total = request.GET.get('total') in ('1', 'true')
+    include_facets = request.GET.get('facets') in ('1', 'true')
+    
+    async def compute():
+        products = filters.apply(Product.objects.filter(available=True).select_related('category'), category_ids)
+        paginator = KeysetPaginator(products, SORT_ORDERINGS[sort_by], page_size)
+        data = api_products_payload(await paginator.aget_page(cursor), page_size)
+        if include_total:
+            data['total'], data['total_is_exact'] = await aestimate_count(products)
+        return data
+    
+    try:
+        data = await acached_catalog(
+            'api_products', (sort_by, cursor, page_size, include_total, *filters.cache_parts), compute,
+            stock_cache_timeout() if filters.in_stock else None,
+        )
+    except InvalidCursor as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    if include_facets:
+        data = {**data, 'facets': build_facets(await afacet_rows('', filters), categories, filters, category_ids)}
+    return JsonResponse(data)
+
+@query_budget(6)
+async def api_cart_status(request):
+    """Async version of ``store.views.api_cart_status``."""
+    cart = await aget_cart(request)
+    data = {
+        'cart_count': cart.get_total_quantity(),
+        'cart_total': float(cart.get_total_cost())
+    }
+    if request.GET.get('summary') not in ('1', 'true'):
+        items = [item async for item in cart.items.select_related('product')] if cart.pk else []
+        data['cart_items'] = [{
+            'id': item.id,
+            'product_name': item.product.name,
+            'product_price': float(item.product.price),
+            'quantity': item.quantity,
+            'total': float(item.get_cost())
+        } for item in items]
+    
+    return JsonResponse(data)
+
+# Product, session, user and cart lookups, BEGIN + INSERT for a user's first
+# cart, then BEGIN, the reservation (3-4), the cart line upsert (2) and the
+# summary refresh (2). An anonymous visitor's first add stays under this: its
+# cart INSERT needs no BEGIN and the session is saved after the view.
+@query_budget(15)
+async def cart_add(request, product_id):
+    """Async version of ``store.views.cart_add``."""
+    # require_POST cannot wrap async views before Django 5.0.
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    product = await _aget_product(product_id)
+    cart = await aget_cart(request, create=True)
+    quantity = int(request.POST.get('quantity', 1))
+    
+    try:
+        if quantity > 0:
+            await sync_to_async(add_item)(cart, product, quantity)
+        elif quantity < 0:
+            await sync_to_async(remove_item)(cart, product, -quantity)
+    except OutOfStock as exc:
+        if _is_ajax(request):
+            return JsonResponse({'success': False, 'message': str(exc)})
+        messages.error(request, str(exc))
+        return redirect(product.get_absolute_url())
+    
+    if _is_ajax(request):
+        return JsonResponse({
+            'success': True,
+            'message': f'{product.name} added to your cart.',
+            'cart_count': cart.get_total_quantity(),
+            'cart_total': float(cart.get_total_cost())
+        })
+    
+    messages.success(request, f'{product.name} added to your cart.')
+    return redirect('store:cart_detail')
+
+# Product, session, user and cart lookups, then BEGIN, the line update or
+# delete (1-2), the stock release (3) and the summary refresh (2).
+@query_budget(12)
+async def cart_remove(request, product_id):
+    """Async version of ``store.views.cart_remove``."""
+    product = await _aget_product(product_id)
+    cart = await aget_cart(request)
+    
+    if cart.pk and await sync_to_async(remove_item)(cart, product):
+        if _is_ajax(request):
+            return JsonResponse({
+                'success': True,
+                'message': f'Removed {product.name} from your cart.',
+                'cart_count': cart.get_total_quantity(),
+                'cart_total': float(cart.get_total_cost())
+            })
+        
+        messages.success(request, f'Removed {product.name} from your cart.')
+    elif _is_ajax(request):
+        return JsonResponse({'success': False, 'message': 'Item not found in cart.'})
+    
+    return redirect('store:cart_detail')
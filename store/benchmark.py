@@ -0,0 +1,359 @@
+"""
+Synthetic data and request scenarios for benchmarking the store.
+
+``generate_data`` fills the database with a reproducible catalog, users,
+carts and orders (everything it creates is prefixed ``bench-`` so
+``clear_data`` can remove it again). ``run_scenario`` drives one scenario
+either in-process through Django's test ``Client`` -- which also counts the
+queries each request runs -- or over HTTP against a running server, and
+returns latency percentiles and throughput. Used by the
+``generate_benchmark_data`` and ``benchmark`` management commands.
+"""
+import http.cookiejar
+import random
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import reverse
+
+from .cache import bump_catalog_version
+from .cart import refresh_summaries
+from .facets import price_buckets
+from .models import Cart, CartItem, Category, Order, OrderItem, Product
+from .queries import QueryCounter
+from .search import get_backend
+
+PREFIX = 'bench'
+PASSWORD = 'benchmark'
+BATCH_SIZE = 1000
+
+ADJECTIVES = ('wireless', 'smart', 'compact', 'premium', 'portable', 'classic', 'ultra', 'eco', 'pro', 'mini')
+NOUNS = ('phone', 'laptop', 'headphones', 'camera', 'watch', 'speaker', 'tablet', 'keyboard', 'monitor', 'charger')
+SEARCH_TERMS = ADJECTIVES + NOUNS + ('wireless phone', 'smart watch', 'pro laptop', 'nothing-matches')
+SORTS = ('name', 'price_low', 'price_high', 'newest')
+SERVER_TIMING_QUERIES = re.compile(r'\bdb;[^,]*desc="(\d+) queries"')
+
+CHECKOUT_DATA = {
+    'first_name': 'Bench', 'last_name': 'Mark', 'email': 'bench@example.com',
+    'address': '1 Load Street', 'postal_code': '12345', 'city': 'Testville',
+}
+
+
+def _batched_create(model, objs):
+    return model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+
+def generate_data(categories=10, products=1000, users=100, carts=50, orders=200, seed=0, log=print):
+    """Create a reproducible synthetic dataset; returns a dict of row counts."""
+    rng = random.Random(seed)
+    with transaction.atomic():
+        cats = _batched_create(Category, [
+            Category(name=f'Bench {NOUNS[i % len(NOUNS)].title()} {i}', slug=f'{PREFIX}-cat-{i}')
+            for i in range(categories)
+        ])
+        log(f'{len(cats)} categories')
+
+        rows = []
+        for i in range(products):
+            words = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+            rows.append(Product(
+                category=rng.choice(cats),
+                name=f'{words.title()} {i}',
+                slug=f'{PREFIX}-{i}',
+                description=f'A {words} with {rng.choice(ADJECTIVES)} features, model {i}.',
+                price=Decimal(rng.randint(100, 200000)) / 100,
+                available=rng.random() < 0.95,
+                # Most products don't track stock, so cart/checkout scenarios never run out.
+                stock=rng.randint(100, 10000) if rng.random() < 0.2 else None,
+            ))
+        prods = _batched_create(Product, rows)
+        untracked = [p for p in prods if p.available and p.stock is None]
+        log(f'{len(prods)} products')
+
+        # Hashing once keeps user creation fast; every user shares PASSWORD.
+        password = make_password(PASSWORD)
+        people = _batched_create(User, [
+            User(username=f'{PREFIX}-user-{i}', email=f'{PREFIX}-user-{i}@example.com', password=password)
+            for i in range(users)
+        ])
+        log(f'{len(people)} users')
+
+        user_carts = _batched_create(Cart, [Cart(user=user) for user in people[:carts]])
+        _batched_create(CartItem, [
+            CartItem(cart=cart, product=product, quantity=rng.randint(1, 3))
+            for cart in user_carts
+            for product in rng.sample(untracked, min(len(untracked), rng.randint(1, 5)))
+        ])
+        refresh_summaries(Cart.objects.filter(user__username__startswith=f'{PREFIX}-user-'))
+        log(f'{len(user_carts)} carts')
+
+        made_orders = _batched_create(Order, [
+            Order(user=rng.choice(people), **CHECKOUT_DATA, paid=rng.random() < 0.8)
+            for _ in range(orders if people else 0)
+        ])
+        items = []
+        for order in made_orders:
+            for product in rng.sample(untracked, min(len(untracked), rng.randint(1, 4))):
+                items.append(OrderItem(order=order, product=product, price=product.price, quantity=rng.randint(1, 3)))
+        _batched_create(OrderItem, items)
+        log(f'{len(made_orders)} orders')
+
+    # bulk_create skips the signals that keep these in sync.
+    get_backend().rebuild()
+    bump_catalog_version()
+    return {'categories': len(cats), 'products': len(prods), 'users': len(people),
+            'carts': len(user_carts), 'orders': len(made_orders)}
+
+
+def clear_data():
+    """Delete everything ``generate_data`` created."""
+    with transaction.atomic():
+        # Cascades to carts, cart items and orders.
+        User.objects.filter(username__startswith=f'{PREFIX}-user-').delete()
+        Category.objects.filter(slug__startswith=f'{PREFIX}-cat-').delete()
+    get_backend().rebuild()
+    bump_catalog_version()
+
+
+class Fixtures:
+    """Ids and URLs the scenarios pick from, loaded once per run."""
+
+    def __init__(self):
+        products = Product.objects.filter(available=True, slug__startswith=f'{PREFIX}-')
+        self.product_slugs = list(products.values_list('slug', flat=True))
+        self.cart_product_ids = list(products.filter(stock__isnull=True).values_list('pk', flat=True))
+        self.category_slugs = list(
+            Category.objects.filter(slug__startswith=f'{PREFIX}-cat-').values_list('slug', flat=True)
+        )
+        self.users = list(
+            User.objects.filter(username__startswith=f'{PREFIX}-user-').values_list('pk', 'email')
+        )
+        if not self.product_slugs or not self.cart_product_ids:
+            raise ValueError('No benchmark data found; run generate_benchmark_data first.')
+
+
+class ClientSession:
+    """Issue requests through Django's test client, counting queries."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def login(self, user_id, email):
+        self.client.force_login(User.objects.get(pk=user_id))
+
+    def request(self, method, path, data=None, ajax=False):
+        headers = {'X-Requested-With': 'XMLHttpRequest'} if ajax else {}
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            response = getattr(self.client, method)(path, data or {}, headers=headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, counter.count
+
+    def close(self):
+        connections.close_all()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """
+    Issue requests to a running server with a cookie jar and CSRF token.
+
+    Query counts are read from the ``Server-Timing`` header added by
+    ``store.middleware.MetricsMiddleware`` when the server sends it (with
+    ``DEBUG`` or ``SERVER_TIMING=True``).
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect,
+        )
+
+    def csrf_token(self):
+        token = next((c.value for c in self.cookies if c.name == 'csrftoken'), None)
+        if token is None:
+            # The login page renders a form, which sets the CSRF cookie.
+            self.request('get', reverse('account_login'))
+            token = next((c.value for c in self.cookies if c.name == 'csrftoken'), '')
+        return token
+
+    def login(self, user_id, email):
+        self.request('post', reverse('account_login'), {'login': email, 'password': PASSWORD})
+
+    def request(self, method, path, data=None, ajax=False):
+        url = self.base_url + path
+        body = None
+        headers = {'Referer': self.base_url + '/'}
+        if ajax:
+            headers['X-Requested-With'] = 'XMLHttpRequest'
+        if method == 'get' and data:
+            url += '?' + urllib.parse.urlencode(data)
+        elif method == 'post':
+            headers['X-CSRFToken'] = self.csrf_token()
+            body = urllib.parse.urlencode(data or {}).encode()
+        start = time.perf_counter()
+        try:
+            with self.opener.open(urllib.request.Request(url, data=body, headers=headers)) as response:
+                response.read()
+                status, response_headers = response.status, response.headers
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            status, response_headers = exc.code, exc.headers
+        elapsed = time.perf_counter() - start
+        match = SERVER_TIMING_QUERIES.search(response_headers.get('Server-Timing', ''))
+        return status, elapsed, int(match.group(1)) if match else None
+
+    def close(self):
+        pass
+
+
+# Each scenario is (setup, request): ``setup`` runs untimed before every
+# request (e.g. putting an item in the cart so there is something to remove).
+
+def _product_list(session, fx, rng):
+    params = {'sort': rng.choice(SORTS)}
+    if rng.random() < 0.5:
+        params['search'] = rng.choice(SEARCH_TERMS)
+    # Shoppers refine listings with the price and stock facets.
+    if rng.random() < 0.3:
+        params['price'] = rng.choice(price_buckets()).key
+    if rng.random() < 0.2:
+        params['in_stock'] = '1'
+    path = reverse('store:product_list')
+    if rng.random() < 0.3:
+        path = reverse('store:product_list_by_category', args=[rng.choice(fx.category_slugs)])
+    return session.request('get', path, params)
+
+
+def _product_detail(session, fx, rng):
+    return session.request('get', reverse('store:product_detail', args=[rng.choice(fx.product_slugs)]))
+
+
+def _add_to_cart(session, fx, rng):
+    product_id = rng.choice(fx.cart_product_ids)
+    session.last_product_id = product_id
+    return session.request('post', reverse('store:cart_add', args=[product_id]), {'quantity': 1}, ajax=True)
+
+
+def _fill_cart_once(session, fx, rng):
+    if not getattr(session, 'last_product_id', None):
+        _add_to_cart(session, fx, rng)
+
+
+def _remove_from_cart(session, fx, rng):
+    return session.request('post', reverse('store:cart_remove', args=[session.last_product_id]), ajax=True)
+
+
+def _api_cart_status(session, fx, rng):
+    return session.request('get', reverse('store:api_cart_status'))
+
+
+def _api_products(session, fx, rng):
+    params = {'sort': rng.choice(SORTS)}
+    if rng.random() < 0.3:
+        params['category'] = rng.choice(fx.category_slugs)
+    if rng.random() < 0.3:
+        params['price'] = rng.choice(price_buckets()).key
+    if rng.random() < 0.2:
+        params['facets'] = '1'
+    return session.request('get', reverse('store:api_products'), params)
+
+
+def _checkout(session, fx, rng):
+    return session.request('post', reverse('store:checkout'), CHECKOUT_DATA)
+
+
+SCENARIOS = {
+    'product_list': (None, _product_list),
+    'product_detail': (None, _product_detail),
+    'cart_add': (None, _add_to_cart),
+    'cart_remove': (_add_to_cart, _remove_from_cart),
+    'api_cart_status': (_fill_cart_once, _api_cart_status),
+    'api_products': (None, _api_products),
+    'checkout': (_add_to_cart, _checkout),
+}
+# Scenarios that need a logged-in user.
+LOGIN_REQUIRED = {'checkout'}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, concurrency=1):
+    """
+    Aggregate ``(status, seconds, queries)`` samples into a result dict.
+
+    Throughput is derived from the timed requests only (untimed setup and
+    warm-up requests are excluded): ``concurrency`` requests in flight,
+    each taking the mean latency.
+    """
+    latencies = sorted(seconds * 1000 for _, seconds, _ in samples)
+    queries = [count for _, _, count in samples if count is not None]
+    busy = sum(latencies) / 1000
+    return {
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'errors': sum(1 for status, _, _ in samples if status >= 400),
+        'throughput': len(samples) * concurrency / busy if busy else None,
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies) if latencies else None,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None,
+        },
+        'queries': {
+            'mean': sum(queries) / len(queries) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+    }
+
+
+def run_scenario(name, fixtures, requests=200, concurrency=1, warmup=10, base_url=None, seed=0):
+    """Run ``requests`` timed requests of scenario ``name`` and summarize them."""
+    setup, step = SCENARIOS[name]
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+
+    def worker(index):
+        rng = random.Random(f'{seed}-{name}-{index}')
+        session = HttpSession(base_url) if base_url else ClientSession()
+        try:
+            if name in LOGIN_REQUIRED:
+                session.login(*fixtures.users[index % len(fixtures.users)])
+            samples = []
+            for i in range(warmup + per_worker[index]):
+                if setup:
+                    setup(session, fixtures, rng)
+                sample = step(session, fixtures, rng)
+                if i >= warmup:
+                    samples.append(sample)
+            return samples
+        finally:
+            session.close()
+
+    if name in LOGIN_REQUIRED and not fixtures.users:
+        raise ValueError(f'Scenario {name} needs benchmark users.')
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = [sample for result in pool.map(worker, range(concurrency)) for sample in result]
+    return summarize(samples, concurrency)
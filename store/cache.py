@@ -0,0 +1,84 @@
+"""
+Catalog caching.
+
+Cached catalog data is keyed under a global *catalog version*. Saving or
+deleting a product or category bumps the version (see ``store.signals``),
+which atomically orphans every previously cached entry, so nothing has to be
+deleted key by key.
+
+The version only reaches the processes that share the cache. With the
+per-process ``LocMemCache`` default, a change made in one worker leaves the
+other workers serving their copies until ``CATALOG_CACHE_TIMEOUT`` expires,
+so deployments running more than one process must point ``settings.CACHES``
+at a shared backend such as Redis or Memcached (``manage.py check --deploy``
+warns otherwise). The alias can be changed with ``STORE_CACHE_ALIAS``.
+"""
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+VERSION_KEY = 'store:catalog-version'
+DEFAULT_TIMEOUT = 60 * 15
+
+
+def get_cache():
+    return caches[getattr(settings, 'STORE_CACHE_ALIAS', 'default')]
+
+
+def cache_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def catalog_version():
+    """Return the current catalog version, initialising it if needed."""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a lost version key never resurrects old entries.
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog entry."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def catalog_key(name, *parts):
+    """Build a versioned cache key for ``name`` varying on ``parts``."""
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'store:catalog:{catalog_version()}:{name}:{digest}'
+
+
+def cached_catalog(name, parts, compute, timeout=None):
+    """Return the cached value for ``(name, parts)``, computing it on a miss."""
+    cache = get_cache()
+    key = catalog_key(name, *parts)
+    value = cache.get(key)
+    metrics.record_cache(value is not None)
+    if value is None:
+        value = compute()
+        cache.set(key, value, cache_timeout() if timeout is None else timeout)
+    return value
+
+
+async def acached_catalog(name, parts, compute, timeout=None):
+    """Async version of ``cached_catalog``; ``compute`` is a coroutine function."""
+    cache = get_cache()
+    key = await sync_to_async(catalog_key)(name, *parts)
+    value = await cache.aget(key)
+    metrics.record_cache(value is not None)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, cache_timeout() if timeout is None else timeout)
+    return value
@@ -0,0 +1,200 @@
+"""
+Cart mutations.
+
+Item quantities are changed with single conditional ``UPDATE`` statements
+(``quantity = quantity + n``) backed by a unique ``(cart, product)``
+constraint, so concurrent requests cannot lose updates. Every mutation also
+refreshes the denormalized ``Cart.item_count``/``Cart.subtotal`` in the same
+transaction, which lets the cart badge and API read a single row.
+"""
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import inventory
+from .models import MONEY, ZERO, Cart, CartItem, StockReservation
+
+
+def _item_sum(expression, output_field=None):
+    return Subquery(
+        CartItem.objects.filter(cart=OuterRef('pk'))
+        .order_by()
+        .values('cart')
+        .annotate(total=Sum(expression, output_field=output_field))
+        .values('total')
+    )
+
+
+def refresh_summaries(carts):
+    """Recompute ``item_count``/``subtotal`` for ``carts`` (a queryset) in one UPDATE."""
+    return carts.update(
+        item_count=Coalesce(_item_sum('quantity'), 0),
+        subtotal=Coalesce(_item_sum(F('quantity') * F('product__price'), MONEY), ZERO),
+        updated=timezone.now(),
+    )
+
+
+def _refresh(cart):
+    refresh_summaries(Cart.objects.filter(pk=cart.pk))
+    cart.refresh_from_db(fields=['item_count', 'subtotal', 'updated'])
+
+
+def resolve_cart(request):
+    """
+    Find the cart belonging to ``request`` without creating one.
+
+    Visitors without a cart get an unsaved, empty ``Cart`` which is only
+    written to the database by ``get_cart(request, create=True)``.
+    """
+    if request.user.is_authenticated:
+        return Cart.objects.filter(user=request.user).first() or Cart(user=request.user)
+    cart_id = request.session.get('cart_id')
+    cart = Cart.objects.filter(id=cart_id, user=None).first() if cart_id else None
+    return cart or Cart()
+
+
+def _request_cart(request):
+    if not hasattr(request, '_cached_cart'):
+        request._cached_cart = resolve_cart(request)
+    return request._cached_cart
+
+
+def get_cart(request, create=False):
+    """
+    Return the request's cart, resolved at most once per request.
+
+    With ``create`` an unsaved cart is persisted first; only cart writes
+    should ask for that, so read-only visits never create cart rows.
+    """
+    cart = _request_cart(request)
+    if create and cart.pk is None:
+        if cart.user_id is not None:
+            _save_user_cart(cart)
+        else:
+            cart.save()
+            request.session['cart_id'] = cart.pk
+    return cart
+
+
+def _save_user_cart(cart):
+    """Insert a user's new cart, or load the one a concurrent request created first."""
+    # resolve_cart already found no cart, so there is no need to look again first.
+    try:
+        with transaction.atomic():
+            cart.save()
+    except IntegrityError:
+        saved = Cart.objects.get(user_id=cart.user_id)
+        # Update the instance in place so request.cart sees the saved row.
+        for field in Cart._meta.concrete_fields:
+            setattr(cart, field.attname, getattr(saved, field.attname))
+        cart._state.adding = False
+
+
+async def aget_user(request):
+    """Resolve the lazy ``request.user`` without blocking the event loop."""
+    # Django 4.2 has no request.auser(); loading the session and user is sync.
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def aresolve_cart(request):
+    """Async version of ``resolve_cart``."""
+    user = await aget_user(request)
+    if user.is_authenticated:
+        return await Cart.objects.filter(user=user).afirst() or Cart(user=user)
+    cart_id = await sync_to_async(request.session.get)('cart_id')
+    cart = await Cart.objects.filter(id=cart_id, user=None).afirst() if cart_id else None
+    return cart or Cart()
+
+
+async def aget_cart(request, create=False):
+    """Async version of ``get_cart``, sharing its per-request cache."""
+    if not hasattr(request, '_cached_cart'):
+        request._cached_cart = await aresolve_cart(request)
+    cart = request._cached_cart
+    if create and cart.pk is None:
+        if cart.user_id is not None:
+            await sync_to_async(_save_user_cart)(cart)
+        else:
+            await cart.asave()
+            await sync_to_async(request.session.__setitem__)('cart_id', cart.pk)
+    return cart
+
+
+def add_item(cart, product, quantity=1):
+    """
+    Add ``quantity`` of ``product`` to ``cart``, creating the line if needed.
+
+    Raises ``inventory.OutOfStock`` if the units cannot be reserved.
+    """
+    if quantity < 1:
+        raise ValueError('quantity must be positive')
+    with transaction.atomic():
+        inventory.reserve(cart, product, quantity)
+        # Upsert: make sure the line exists (a no-op on conflict), then bump it.
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product=product, quantity=0)], ignore_conflicts=True
+        )
+        CartItem.objects.filter(cart=cart, product=product).update(quantity=F('quantity') + quantity)
+        _refresh(cart)
+
+
+def remove_item(cart, product, quantity=1):
+    """
+    Remove ``quantity`` of ``product`` from ``cart``, dropping the line at zero.
+
+    Returns False if the product was not in the cart.
+    """
+    lines = CartItem.objects.filter(cart=cart, product=product)
+    with transaction.atomic():
+        if lines.filter(quantity__gt=quantity).update(quantity=F('quantity') - quantity):
+            inventory.release(cart, product, quantity)
+        else:
+            deleted, _ = lines.delete()
+            if not deleted:
+                return False
+            inventory.release(cart, product)
+        _refresh(cart)
+    return True
+
+
+def _merge_lines(model, source, target):
+    """Fold ``model`` rows (cart lines or reservations) of ``source`` into ``target``."""
+    source_rows = model.objects.filter(cart=source)
+    # Products both carts hold: add the source quantity onto the target row.
+    model.objects.filter(
+        cart=target, product__in=source_rows.values('product')
+    ).update(quantity=F('quantity') + Subquery(
+        source_rows.filter(product=OuterRef('product')).values('quantity')[:1]
+    ))
+    # Everything else simply changes hands.
+    source_rows.exclude(
+        product__in=model.objects.filter(cart=target).values('product')
+    ).update(cart=target)
+
+
+def merge_carts(source_id, user):
+    """
+    Merge the anonymous cart ``source_id`` into ``user``'s cart.
+
+    Runs a constant number of queries regardless of cart size: if the user
+    has no cart the anonymous one is simply adopted, otherwise quantities
+    are summed for shared products, the remaining lines and stock
+    reservations are reassigned in bulk and the empty source cart deleted.
+    """
+    with transaction.atomic():
+        if not Cart.objects.filter(pk=source_id, user=None).exists():
+            return
+        target = Cart.objects.select_for_update().filter(user=user).first()
+        if target is None:
+            Cart.objects.filter(pk=source_id).update(user=user)
+            return
+        for model in (CartItem, StockReservation):
+            _merge_lines(model, source_id, target)
+        Cart.objects.filter(pk=source_id).delete()
+        StockReservation.objects.filter(cart=target).update(
+            expires_at=timezone.now() + inventory.reservation_ttl()
+        )
+        refresh_summaries(Cart.objects.filter(pk=target.pk))
@@ -0,0 +1,76 @@
+"""
+Order placement.
+
+``place_order`` turns a cart into an order inside a single transaction: the
+cart's products are locked and priced with one query, the cart lines are
+re-read under lock, all order lines are written with one ``bulk_create`` and
+the ordered lines are removed with one ``DELETE``.
+A failure at any point leaves neither a partial order nor a cleared cart.
+
+The confirmation email is queued in the same transaction and sent by the
+task worker, so it never adds to checkout latency.
+"""
+from django.db import transaction
+
+from . import inventory
+from .cart import refresh_summaries
+from .models import Cart, CartItem, Order, OrderItem, Product
+from .tasks import send_order_confirmation
+
+SHIPPING_FIELDS = ('first_name', 'last_name', 'email', 'address', 'postal_code', 'city')
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be turned into an order."""
+
+
+def place_order(cart, user, shipping):
+    """
+    Create an order for ``user`` from the contents of ``cart``.
+
+    ``shipping`` maps the ``SHIPPING_FIELDS`` to their values (typically a
+    form's ``cleaned_data``). Raises ``CheckoutError`` if the cart is empty
+    or holds products that are no longer available or out of stock.
+    """
+    with transaction.atomic():
+        product_ids = list(CartItem.objects.filter(cart=cart).values_list('product_id', flat=True))
+        if not product_ids:
+            raise CheckoutError('Your cart is empty.')
+        
+        # Lock the products (in a stable order) so prices cannot change mid-checkout.
+        products = {
+            p.pk: p for p in Product.objects.select_for_update()
+            .filter(pk__in=product_ids)
+            .order_by('pk')
+            .only('id', 'name', 'price', 'available')
+        }
+        # Re-read the lines under lock: a concurrent request may have changed
+        # them since. Lines for products added in between stay in the cart.
+        lines = list(
+            CartItem.objects.select_for_update()
+            .filter(cart=cart, product_id__in=list(products))
+            .values_list('pk', 'product_id', 'quantity')
+        )
+        if not lines:
+            raise CheckoutError('Your cart is empty.')
+        unavailable = [p.name for p in products.values() if not p.available]
+        if unavailable:
+            raise CheckoutError(f'No longer available: {", ".join(sorted(unavailable))}.')
+        
+        try:
+            inventory.fulfil(cart, [(product_id, quantity) for _, product_id, quantity in lines])
+        except inventory.OutOfStock as exc:
+            raise CheckoutError(str(exc))
+        
+        order = Order.objects.create(user=user, **{f: shipping[f] for f in SHIPPING_FIELDS})
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, price=products[product_id].price, quantity=quantity)
+            for _, product_id, quantity in lines
+        ])
+        
+        # Only delete the lines that were ordered.
+        CartItem.objects.filter(pk__in=[pk for pk, _, _ in lines]).delete()
+        refresh_summaries(Cart.objects.filter(pk=cart.pk))
+        
+        send_order_confirmation.delay(order.pk)
+    return order
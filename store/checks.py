@@ -0,0 +1,25 @@
+"""System checks for the store's deployment settings."""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends that keep a separate cache in every process.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_catalog_cache(app_configs, **kwargs):
+    alias = getattr(settings, 'STORE_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PER_PROCESS_CACHES:
+        return []
+    return [Warning(
+        f'The catalog cache ({alias!r}) uses {backend}, which is not shared between processes.',
+        hint=(
+            'Catalog invalidations only reach the process that made the change; other '
+            'workers serve stale pages for up to CATALOG_CACHE_TIMEOUT seconds. Set '
+            'CACHE_BACKEND/CACHE_LOCATION to a shared cache such as Redis or Memcached.'
+        ),
+        id='store.W001',
+    )]
@@ -0,0 +1,153 @@
+"""
+HTTP conditional requests for catalog views.
+
+Catalog responses are a pure function of the request and of the catalog rows
+they render, so each view declares a *validators* function returning an
+ETag derived from ``MAX(updated)`` and ``COUNT(*)`` over those rows. The
+aggregates are stored with ``cached_catalog`` and therefore cost no queries
+until the next catalog change.
+
+The catalog views send no ``Last-Modified``: deletions, stock reservations
+and the logged-in user all change a page without leaving a newer
+``updated`` behind, so ``If-Modified-Since`` alone would answer 304 for
+stale pages. Only the ETag covers that state.
+
+When the client's ``If-None-Match`` still matches, the view is never called:
+no template is rendered and no JSON is serialized.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import cached_catalog
+from .facets import FacetFilters, category_list, facet_rows
+from .models import Category, Product
+
+
+def catalog_state(category_slug=None):
+    """
+    Return a fingerprint of the products of one category (or all of them)
+    plus the category list, which every catalog page shows.
+    """
+    def compute():
+        products = Product.objects.all()
+        if category_slug:
+            products = products.filter(category__slug=category_slug)
+        product_state = products.aggregate(updated=Max('updated'), count=Count('id'))
+        category_state = Category.objects.aggregate(updated=Max('updated'), count=Count('id'))
+        # The counts catch deletions, which leave no timestamp behind.
+        return (
+            product_state['updated'], product_state['count'],
+            category_state['updated'], category_state['count'],
+        )
+    return cached_catalog('catalog_state', (category_slug,), compute)
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def has_pending_messages(request):
+    # len() does not mark the messages as read, unlike iterating over them.
+    return bool(len(get_messages(request)))
+
+
+def _check(request, result):
+    """Return ``(not_modified_response_or_None, etag, timestamp)``."""
+    etag, last_modified = result
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp), etag, timestamp
+
+
+def _add_validators(response, etag, timestamp):
+    if response.status_code == 200:
+        if etag and not response.has_header('ETag'):
+            response.headers['ETag'] = etag
+        if timestamp and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def conditional(validators):
+    """
+    Answer conditional GET/HEAD requests for a view.
+
+    ``validators(request, *args, **kwargs)`` returns ``(etag, last_modified)``
+    (either may be ``None``), or ``None`` to skip conditional handling for
+    that request. Validators are added to successful responses. Works on
+    both sync and async views; for async views the (sync) validators run in
+    a thread.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapped(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+                result = await sync_to_async(validators)(request, *args, **kwargs)
+                if result is None:
+                    return await view_func(request, *args, **kwargs)
+                response, etag, timestamp = _check(request, result)
+                if response is None:
+                    response = _add_validators(await view_func(request, *args, **kwargs), etag, timestamp)
+                return response
+            return async_wrapped
+
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            result = validators(request, *args, **kwargs)
+            if result is None:
+                return view_func(request, *args, **kwargs)
+            response, etag, timestamp = _check(request, result)
+            if response is None:
+                response = _add_validators(view_func(request, *args, **kwargs), etag, timestamp)
+            return response
+        return wrapped
+    return decorator
+
+
+def product_list_validators(request, category_slug=None):
+    # Flash messages are rendered once, so a page showing them is never reusable.
+    if has_pending_messages(request):
+        return None
+    # The sidebar counts every category's products, so the whole catalog counts.
+    fingerprint = catalog_state()
+    # Facet counts also follow stock, which changes without touching ``updated``.
+    filters = FacetFilters.from_request(request, category_list(), category_slug)
+    rows = sorted(facet_rows(request.GET.get('search', '').strip(), filters).items())
+    # The navbar shows who is logged in.
+    return make_etag('product_list', request.get_full_path(), request.user.pk, fingerprint, rows), None
+
+
+def product_detail_validators(request, slug):
+    if has_pending_messages(request):
+        return None
+    # Stock reservations change ``reserved`` without touching ``updated``.
+    row = Product.objects.filter(slug=slug, available=True).values(
+        'updated', 'stock', 'reserved', 'category__slug'
+    ).first()
+    if row is None:
+        return None
+    # Related products and the category name come from the product's category.
+    fingerprint = catalog_state(row['category__slug'])
+    etag = make_etag(
+        'product_detail', slug, request.user.pk, row['updated'], row['stock'], row['reserved'], fingerprint
+    )
+    return etag, None
+
+
+def api_products_validators(request):
+    filters = FacetFilters.from_request(request, category_list())
+    fingerprint = catalog_state(filters.categories[0] if len(filters.categories) == 1 else None)
+    rows = None
+    if filters.in_stock or request.GET.get('facets') in ('1', 'true'):
+        # Stock changes without touching ``updated``; the stock counts track it.
+        rows = sorted(facet_rows('', filters).items())
+    return make_etag('api_products', request.get_full_path(), fingerprint, rows), None
@@ -0,0 +1,70 @@
+"""
+Streaming catalog export.
+
+Partners sync the whole catalog in one request, so the export never builds
+the full result in memory: rows are read from the database in chunks with
+``QuerySet.iterator()`` and ``values()`` projections (no model instances),
+and each one is encoded and yielded to a ``StreamingHttpResponse`` as soon as
+it is read. Peak memory is bounded by ``STORE_EXPORT_CHUNK_SIZE`` rows
+regardless of catalog size.
+"""
+import json
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Product
+
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = ('id', 'name', 'slug', 'price', 'description', 'image', 'category__name', 'stock', 'reserved', 'updated')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def chunk_size():
+    return getattr(settings, 'STORE_EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def export_rows(category=None):
+    """Yield one dict per available product, ordered by id."""
+    products = Product.objects.filter(available=True)
+    if category is not None:
+        products = products.filter(category=category)
+
+    for row in products.order_by('id').values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size()):
+        stock = row.pop('stock')
+        reserved = row.pop('reserved')
+        row['category'] = row.pop('category__name')
+        row['price'] = float(row['price'])
+        row['image'] = default_storage.url(row['image']) if row['image'] else None
+        row['available_stock'] = None if stock is None else max(stock - reserved, 0)
+        yield row
+
+
+def _dumps(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def stream_ndjson(rows):
+    """Encode rows as newline-delimited JSON, one object per line."""
+    for row in rows:
+        yield _dumps(row) + '\n'
+
+
+def stream_json_array(rows):
+    """Encode rows as a single JSON array, written element by element."""
+    yield '['
+    separator = ''
+    for row in rows:
+        yield separator + _dumps(row)
+        separator = ','
+    yield ']\n'
+
+
+def stream_export(rows, fmt):
+    return stream_ndjson(rows) if fmt == 'ndjson' else stream_json_array(rows)
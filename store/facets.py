@@ -0,0 +1,195 @@
+"""
+Faceted catalog filtering.
+
+Listings can be narrowed by any combination of categories, price buckets and
+stock availability, selected in the query string
+(``?category=books&category=games&price=25-50&in_stock=1``).
+
+The counts shown next to every facet value come from one grouped query:
+the products matching the search are grouped by category, and each group
+carries conditional ``COUNT(...) FILTER (WHERE ...)`` aggregates for every
+price bucket and for stock. As usual for facets, the counts of a facet
+apply the selections of the *other* facets only, so shoppers see what
+widening a selection would add. Category selection is applied in Python by
+summing the rows of the selected categories, which means every category
+combination shares one cached result per search/price/stock selection.
+
+Reservations and checkouts change stock without bumping the catalog
+version, so anything that depends on stock is cached for
+``STORE_STOCK_CACHE_TIMEOUT`` seconds only.
+"""
+from django.conf import settings
+from django.db.models import Count, F, Q
+
+from .cache import acached_catalog, cache_timeout, cached_catalog
+from .models import Category, Product
+from .search import search_products
+
+# Upper bounds of the price buckets; the last bucket is open-ended.
+DEFAULT_PRICE_BUCKETS = (25, 50, 100, 250, 500)
+STOCK_CACHE_TIMEOUT = 60
+# NULL stock means stock is not tracked, which never runs out.
+IN_STOCK = Q(stock__isnull=True) | Q(stock__gt=F('reserved'))
+
+
+class PriceBucket:
+    """A ``[low, high)`` price range; ``high`` is None for the last bucket."""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+        self.key = f'{low}-{high}' if high is not None else f'{low}-'
+
+    @property
+    def label(self):
+        if not self.low:
+            return f'Under ${self.high}'
+        if self.high is None:
+            return f'${self.low} & above'
+        return f'${self.low} to ${self.high}'
+
+    def q(self):
+        condition = Q(price__gte=self.low)
+        if self.high is not None:
+            condition &= Q(price__lt=self.high)
+        return condition
+
+
+def price_buckets():
+    bounds = [0, *getattr(settings, 'STORE_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS)]
+    return [PriceBucket(low, high) for low, high in zip(bounds, bounds[1:] + [None])]
+
+
+def stock_cache_timeout():
+    return min(getattr(settings, 'STORE_STOCK_CACHE_TIMEOUT', STOCK_CACHE_TIMEOUT), cache_timeout())
+
+
+def category_list():
+    """Every category, ordered by name (cached)."""
+    return cached_catalog('category_list', (), lambda: list(Category.objects.order_by('name')))
+
+
+async def acategory_list():
+    """Async version of ``category_list``."""
+    async def compute():
+        return [category async for category in Category.objects.order_by('name')]
+    return await acached_catalog('category_list', (), compute)
+
+
+class FacetFilters:
+    """A shopper's facet selection; unknown category slugs and price keys are ignored."""
+
+    def __init__(self, categories=(), prices=(), in_stock=False):
+        self.categories = tuple(sorted(set(categories)))
+        selected = set(prices)
+        self.buckets = [bucket for bucket in price_buckets() if bucket.key in selected]
+        self.prices = tuple(bucket.key for bucket in self.buckets)
+        self.in_stock = in_stock
+
+    @classmethod
+    def from_request(cls, request, categories, category_slug=None):
+        """Read the selection from the query string, keeping only slugs found in ``categories``."""
+        known = {category.slug for category in categories}
+        selected = [slug for slug in request.GET.getlist('category') if slug in known]
+        if category_slug in known:
+            selected.append(category_slug)
+        return cls(selected, request.GET.getlist('price'), request.GET.get('in_stock') in ('1', 'true'))
+
+    @property
+    def cache_parts(self):
+        return self.categories, self.prices, self.in_stock
+
+    def category_ids(self, categories):
+        """Resolve the selected slugs against ``categories``, skipping unknown ones."""
+        ids = {category.slug: category.pk for category in categories}
+        return [ids[slug] for slug in self.categories if slug in ids]
+
+    def price_q(self):
+        condition = Q()
+        for bucket in self.buckets:
+            condition |= bucket.q()
+        return condition
+
+    def stock_q(self):
+        return IN_STOCK if self.in_stock else Q()
+
+    def apply(self, queryset, category_ids):
+        """Filter ``queryset`` by every facet selection."""
+        if category_ids:
+            queryset = queryset.filter(category_id__in=category_ids)
+        return queryset.filter(self.price_q() & self.stock_q())
+
+
+def _facet_queryset(search_query, filters):
+    """Per-category counts of the search results under the other facets' selections."""
+    products = Product.objects.filter(available=True)
+    if search_query:
+        products = search_products(products, search_query)
+    price_q, stock_q = filters.price_q(), filters.stock_q()
+    aggregates = {
+        # Category counts apply the price and stock selections.
+        'matching': Count('id', filter=price_q & stock_q),
+        # Availability counts apply the price selection.
+        'in_stock': Count('id', filter=price_q & IN_STOCK),
+    }
+    # Price counts apply the stock selection.
+    for index, bucket in enumerate(price_buckets()):
+        aggregates[f'price_{index}'] = Count('id', filter=bucket.q() & stock_q)
+    return products.order_by().values('category_id').annotate(**aggregates)
+
+
+def facet_rows(search_query, filters):
+    """Return the cached ``{category_id: counts}`` rows for a search and price/stock selection."""
+    def compute():
+        return {row.pop('category_id'): row for row in _facet_queryset(search_query, filters)}
+    return cached_catalog(
+        'facet_rows', (search_query, filters.prices, filters.in_stock), compute, stock_cache_timeout()
+    )
+
+
+async def afacet_rows(search_query, filters):
+    """Async version of ``facet_rows``."""
+    async def compute():
+        return {row.pop('category_id'): row async for row in _facet_queryset(search_query, filters)}
+    return await acached_catalog(
+        'facet_rows', (search_query, filters.prices, filters.in_stock), compute, stock_cache_timeout()
+    )
+
+
+def build_facets(rows, categories, filters, category_ids):
+    """
+    Turn ``facet_rows`` into display-ready facets.
+
+    Returns a JSON-serializable dict of ``categories``, ``price`` and
+    ``availability`` value lists (each value with its ``count`` and whether
+    it is ``selected``) plus the ``total`` number of matching products.
+    """
+    selected_rows = [row for pk, row in rows.items() if not category_ids or pk in category_ids]
+
+    def total(field):
+        return sum(row[field] for row in selected_rows)
+
+    return {
+        'categories': [{
+            'slug': category.slug,
+            'name': category.name,
+            'count': rows[category.pk]['matching'] if category.pk in rows else 0,
+            'selected': category.pk in category_ids,
+        } for category in categories],
+        'price': [{
+            'key': bucket.key,
+            'label': bucket.label,
+            'min': bucket.low,
+            'max': bucket.high,
+            'count': total(f'price_{index}'),
+            'selected': bucket.key in filters.prices,
+        } for index, bucket in enumerate(price_buckets())],
+        'availability': [{
+            'key': 'in_stock',
+            'label': 'In stock',
+            'count': total('in_stock'),
+            'selected': filters.in_stock,
+        }],
+        'all_categories_count': sum(row['matching'] for row in rows.values()),
+        'total': total('matching'),
+    }
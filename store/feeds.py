@@ -0,0 +1,151 @@
+"""
+Parsing and validation of supplier catalog feeds (see ``import_catalog``).
+
+Feeds are CSV files with a header row or NDJSON files with one object per
+line, using the columns in ``FEED_FIELDS``. Rows are read lazily in chunks,
+so files of any size are processed in constant memory, and validated by
+``clean_rows``, which is free of Django model imports so it can run in
+spawned worker processes.
+"""
+import csv
+import io
+import json
+import sys
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.utils.text import slugify
+
+REQUIRED_FIELDS = ('name', 'price', 'category')
+OPTIONAL_FIELDS = ('slug', 'description', 'available', 'stock', 'image')
+FEED_FIELDS = REQUIRED_FIELDS + OPTIONAL_FIELDS
+
+NAME_MAX_LENGTH = 200
+SLUG_MAX_LENGTH = 50
+MAX_PRICE = Decimal('99999999.99')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+
+class RowError(ValueError):
+    """A feed row that cannot be imported."""
+
+
+def detect_format(path):
+    return 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+def open_feed(path):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def read_chunks(fh, fmt, size):
+    """
+    Yield ``(first_row_number, raw_rows)`` chunks of at most ``size`` rows.
+
+    CSV rows are split by the C ``csv`` reader here (quoted fields may span
+    lines) and passed on as dicts; NDJSON lines are passed on undecoded so
+    the JSON parsing happens in ``clean_rows``.
+    """
+    if fmt == 'csv':
+        reader = csv.reader(fh)
+        header = [column.strip().lower() for column in next(reader, [])]
+        missing = set(REQUIRED_FIELDS) - set(header)
+        if missing:
+            raise RowError(f'CSV header is missing: {", ".join(sorted(missing))}')
+        rows = (dict(zip(header, values)) for values in reader if values)
+    else:
+        rows = (line for line in fh if line.strip())
+    number = 1
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield number, chunk
+        number += len(chunk)
+
+
+def _text(row, field):
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def clean_row(row):
+    """Validate one raw row and return a dict of ``FEED_FIELDS`` values."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as exc:
+            raise RowError(f'invalid JSON: {exc}')
+        if not isinstance(row, dict):
+            raise RowError('expected a JSON object')
+
+    name = _text(row, 'name')
+    if not name:
+        raise RowError('name is required')
+    if len(name) > NAME_MAX_LENGTH:
+        raise RowError(f'name is longer than {NAME_MAX_LENGTH} characters')
+
+    slug = slugify(_text(row, 'slug') or name)[:SLUG_MAX_LENGTH].strip('-')
+    if not slug:
+        raise RowError('slug is empty')
+
+    category = _text(row, 'category')
+    if not category:
+        raise RowError('category is required')
+
+    try:
+        price = Decimal(_text(row, 'price'))
+        # NaN survives quantize() but cannot be compared.
+        if not price.is_finite():
+            raise InvalidOperation
+        price = price.quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise RowError(f'invalid price {row.get("price")!r}')
+    if not Decimal(0) <= price <= MAX_PRICE:
+        raise RowError(f'price {price} out of range')
+
+    cleaned = {'name': name, 'slug': slug, 'category': category, 'price': price}
+    if 'description' in row:
+        cleaned['description'] = _text(row, 'description')
+    if 'available' in row:
+        available = row['available']
+        if not isinstance(available, bool):
+            available = _text(row, 'available').lower()
+            if available not in TRUE_VALUES | FALSE_VALUES:
+                raise RowError(f'invalid available value {row["available"]!r}')
+            available = available in TRUE_VALUES
+        cleaned['available'] = available
+    if 'stock' in row:
+        stock = _text(row, 'stock')
+        if stock:
+            try:
+                stock = int(stock)
+            except ValueError:
+                raise RowError(f'invalid stock {row["stock"]!r}')
+            if stock < 0:
+                raise RowError('stock cannot be negative')
+        cleaned['stock'] = stock if stock != '' else None
+    if 'image' in row:
+        cleaned['image'] = _text(row, 'image')
+    return cleaned
+
+
+def clean_rows(first_row, rows):
+    """
+    Validate a chunk of raw rows.
+
+    Returns ``(cleaned, errors)``: lists of ``(row_number, row)`` and
+    ``(row_number, message)``. Runs in worker processes when the import is
+    parallel, so the arguments and result must be picklable.
+    """
+    cleaned, errors = [], []
+    for number, row in enumerate(rows, first_row):
+        try:
+            cleaned.append((number, clean_row(row)))
+        except RowError as exc:
+            errors.append((number, str(exc)))
+    return cleaned, errors
@@ -0,0 +1,147 @@
+"""
+Responsive product images.
+
+For every product image a set of derivatives is written next to the original
+in the same storage: one per width in ``STORE_IMAGE_WIDTHS`` (never wider
+than the original) and per format -- WebP, AVIF when Pillow was built with
+it, and the original's own format as a fallback for old browsers::
+
+    products/2024/05/01/phone.jpg
+    products/2024/05/01/phone.w320.webp
+    products/2024/05/01/phone.w320.avif
+    products/2024/05/01/phone.w320.jpg
+    ...
+
+The names are recorded on ``Product.image_variants`` so templates can build
+``srcset`` attributes (see ``store_images``) without touching the storage.
+Derivatives are generated when a product's image changes and can be
+backfilled with ``python manage.py generate_image_variants``.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .models import Product
+
+DEFAULT_WIDTHS = (320, 640, 1024)
+
+# Pillow format name -> (file extension, save options)
+FORMATS = {
+    'AVIF': ('avif', {'quality': 60}),
+    'WEBP': ('webp', {'quality': 80, 'method': 6}),
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'PNG': ('png', {'optimize': True}),
+}
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpg': 'image/jpeg', 'png': 'image/png'}
+
+
+def image_widths():
+    return tuple(sorted(getattr(settings, 'STORE_IMAGE_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def output_formats(source_format):
+    """Modern formats first, then the fallback matching the original."""
+    formats = ['WEBP']
+    if features.check('avif'):
+        formats.insert(0, 'AVIF')
+    formats.append('PNG' if source_format in ('PNG', 'GIF') else 'JPEG')
+    return formats
+
+
+def variant_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}.w{width}.{extension}'
+
+
+def _prepare(image, fmt):
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        return image.convert('RGB')
+    if fmt != 'JPEG' and image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def generate_variants(product, storage=None):
+    """
+    Write every derivative of ``product.image`` and return the description
+    to store on ``Product.image_variants``::
+
+        {'source': 'products/.../phone.jpg', 'width': 1600, 'height': 1200,
+         'formats': {'webp': {'320': 'products/.../phone.w320.webp', ...}, ...}}
+    """
+    storage = storage or default_storage
+    name = product.image.name
+    with storage.open(name, 'rb') as fh:
+        source = Image.open(fh)
+        source_format = source.format
+        source.load()
+    # Honour camera rotation so derivatives are upright.
+    source = ImageOps.exif_transpose(source)
+    width, height = source.size
+
+    # Never upscale; images narrower than the smallest width get one derivative.
+    widths = [w for w in image_widths() if w <= width] or [width]
+    formats = {}
+    for fmt in output_formats(source_format):
+        extension, options = FORMATS[fmt]
+        for target in widths:
+            resized = source if target == width else source.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS
+            )
+            buffer = BytesIO()
+            _prepare(resized, fmt).save(buffer, fmt, **options)
+            path = variant_name(name, target, extension)
+            if storage.exists(path):
+                storage.delete(path)
+            formats.setdefault(extension, {})[str(target)] = storage.save(path, ContentFile(buffer.getvalue()))
+    return {'source': name, 'width': width, 'height': height, 'formats': formats}
+
+
+def variant_paths(variants):
+    return {path for paths in (variants or {}).get('formats', {}).values() for path in paths.values()}
+
+
+def delete_variants(variants, keep=(), storage=None):
+    storage = storage or default_storage
+    for path in variant_paths(variants) - set(keep):
+        storage.delete(path)
+
+
+def variants_stale(product):
+    return (product.image_variants or {}).get('source') != (product.image.name or None)
+
+
+def update_variants(product):
+    """
+    Regenerate ``product``'s derivatives if its image changed and save them.
+
+    Returns True when the product was updated.
+    """
+    if not variants_stale(product):
+        return False
+    old = product.image_variants
+    if product.image:
+        product.image_variants = generate_variants(product)
+    else:
+        product.image_variants = {}
+    # update() rather than save() so saving does not re-trigger this via signals;
+    # ``updated`` is bumped so cached cards and ETags pick up the new srcset.
+    product.updated = timezone.now()
+    Product.objects.filter(pk=product.pk).update(image_variants=product.image_variants, updated=product.updated)
+    # Remove derivatives of a replaced image; regenerated ones keep their names.
+    delete_variants(old, keep=variant_paths(product.image_variants))
+    return True
+
+
+def srcset(variants, extension):
+    """Build a ``srcset`` value from one format's derivatives."""
+    paths = (variants or {}).get('formats', {}).get(extension, {})
+    return ', '.join(
+        f'{default_storage.url(path)} {width}w' for width, path in sorted(paths.items(), key=lambda i: int(i[0]))
+    )
@@ -0,0 +1,143 @@
+"""
+Stock reservation.
+
+A product's ``reserved`` column counts units held by cart reservations.
+Reserving runs a single conditional ``UPDATE ... WHERE stock >= reserved + n``,
+so concurrent carts never take more than is on hand and no row or table
+lock is held between requests. Reservations expire after
+``STOCK_RESERVATION_TTL`` and are returned to stock by
+``release_expired_reservations``. Reserving, releasing and the expiry sweep
+all lock the reservation rows before touching ``reserved``, so a hold is
+returned to stock exactly once. Checkout converts them into real stock
+decrements with ``fulfil``.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+
+from .models import Product, StockReservation
+
+DEFAULT_RESERVATION_TTL = timedelta(minutes=30)
+
+
+class OutOfStock(Exception):
+    """Raised when a product does not have enough unreserved stock."""
+
+    def __init__(self, product_name):
+        self.product_name = product_name
+        super().__init__(f'Not enough stock for {product_name}.')
+
+
+def reservation_ttl():
+    return getattr(settings, 'STOCK_RESERVATION_TTL', DEFAULT_RESERVATION_TTL)
+
+
+def reserve(cart, product, quantity):
+    """Hold ``quantity`` units of ``product`` for ``cart``; raise ``OutOfStock`` if short."""
+    if product.stock is None:
+        return
+    # Callers (add_item) already hold a transaction, so no savepoint is needed.
+    with transaction.atomic(savepoint=False):
+        # Lock the cart's holds first, as the expiry sweep does, so a hold
+        # cannot be swept between the product and reservation updates.
+        held = set(
+            StockReservation.objects.select_for_update().filter(cart=cart)
+            .order_by('pk').values_list('product_id', flat=True)
+        )
+        updated = Product.objects.filter(
+            pk=product.pk, stock__gte=F('reserved') + quantity
+        ).update(reserved=F('reserved') + quantity)
+        if updated:
+            if product.pk not in held:
+                StockReservation.objects.bulk_create(
+                    [StockReservation(cart=cart, product=product, expires_at=timezone.now())],
+                    ignore_conflicts=True,
+                )
+            # Bump this product's hold; any activity keeps the whole cart's holds alive.
+            StockReservation.objects.filter(cart=cart).update(
+                quantity=Case(
+                    When(product=product, then=F('quantity') + quantity),
+                    default=F('quantity'),
+                    output_field=PositiveIntegerField(),
+                ),
+                expires_at=timezone.now() + reservation_ttl(),
+            )
+    # Raised outside the block so the caller's transaction is not marked for rollback.
+    if not updated:
+        raise OutOfStock(product.name)
+
+
+def release(cart, product, quantity=None):
+    """Return up to ``quantity`` (default: all) held units of ``product`` to stock."""
+    if product.stock is None:
+        return
+    with transaction.atomic(savepoint=False):
+        # Locked so the expiry sweep cannot return the same units concurrently.
+        hold = StockReservation.objects.select_for_update().filter(
+            cart=cart, product=product
+        ).values_list('pk', 'quantity').first()
+        if hold is None:
+            return
+        pk, held_quantity = hold
+        amount = held_quantity if quantity is None else min(quantity, held_quantity)
+        Product.objects.filter(pk=product.pk).update(reserved=F('reserved') - amount)
+        if amount < held_quantity:
+            StockReservation.objects.filter(pk=pk).update(quantity=F('quantity') - amount)
+        else:
+            StockReservation.objects.filter(pk=pk).delete()
+
+
+def release_carts(carts):
+    """Return every unit held by ``carts`` (ids or a queryset) to stock, e.g. before deleting them."""
+    return _release(StockReservation.objects.filter(cart__in=carts))
+
+
+def release_expired_reservations(now=None):
+    """Return stock held by reservations that expired before ``now``; returns the count."""
+    return _release(StockReservation.objects.filter(expires_at__lt=now or timezone.now()))
+
+
+def _release(reservations):
+    with transaction.atomic():
+        # reserve() and release() lock holds too, so a hold is returned only once.
+        rows = list(
+            reservations.select_for_update().order_by('pk').values_list('pk', 'product_id', 'quantity')
+        )
+        if not rows:
+            return 0
+        held = {}
+        for _, product_id, quantity in rows:
+            held[product_id] = held.get(product_id, 0) + quantity
+        for product_id, quantity in held.items():
+            Product.objects.filter(pk=product_id).update(reserved=F('reserved') - quantity)
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+    return len(rows)
+
+
+def fulfil(cart, lines):
+    """
+    Take ordered stock off the shelf for ``lines`` of ``(product_id, quantity)``.
+
+    Units reserved by ``cart`` are consumed first; any shortfall must still
+    be unreserved, otherwise ``OutOfStock`` is raised. Must run inside the
+    checkout transaction.
+    """
+    held = dict(
+        StockReservation.objects.filter(cart=cart).values_list('product_id', 'quantity')
+    )
+    for product_id, quantity in lines:
+        hold = held.pop(product_id, 0)
+        # NULL stock (untracked) satisfies the condition and stays NULL.
+        updated = Product.objects.filter(pk=product_id).filter(
+            Q(stock__isnull=True) | Q(stock__gte=F('reserved') - hold + quantity)
+        ).update(stock=F('stock') - quantity, reserved=F('reserved') - hold)
+        if not updated:
+            name = Product.objects.filter(pk=product_id).values_list('name', flat=True).first()
+            raise OutOfStock(name)
+    if held:
+        # Holds on products that were not ordered go back to stock.
+        _release(StockReservation.objects.filter(cart=cart, product_id__in=list(held)))
+    StockReservation.objects.filter(cart=cart).delete()
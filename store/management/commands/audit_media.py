@@ -0,0 +1,165 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from store.cache import bump_catalog_version
+from store.images import variant_paths
+from store.models import Product
+
+MAX_LISTED = 20
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} TB'
+
+
+class Command(BaseCommand):
+    help = 'Find product images missing from disk and media files no product references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', default='products', help='Directory under MEDIA_ROOT holding product images')
+        parser.add_argument('--fix-broken', action='store_true', help='Clear image references whose file is missing')
+        parser.add_argument('--delete-orphans', action='store_true', help='Delete files no product references')
+        parser.add_argument('--dry-run', action='store_true', help='Report what --fix-broken/--delete-orphans would do')
+        parser.add_argument('--min-age', type=float, default=24, help='Hours a file must be old to count as orphaned')
+        parser.add_argument('--workers', type=int, default=16, help='Threads used for filesystem checks')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Products/files checked per chunk')
+        parser.add_argument('--batch-size', type=int, default=500, help='Maximum deletions/updates per batch')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between deletion batches')
+
+    def handle(self, *args, **options):
+        try:
+            self.root = default_storage.path('')
+        except NotImplementedError:
+            raise CommandError('audit_media only supports local file storage.')
+        self.options = options
+        self.verbosity = options['verbosity']
+        self.pool = ThreadPoolExecutor(max_workers=options['workers'])
+        try:
+            referenced = self.check_references()
+            self.check_orphans(referenced)
+        finally:
+            self.pool.shutdown()
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.root, name))
+
+    def check_references(self):
+        """Stat every referenced image and variant; returns the set of referenced names."""
+        referenced = set()
+        broken, stale = [], []
+        rows = (
+            Product.objects.exclude(image='').order_by('pk')
+            .values_list('pk', 'image', 'image_variants')
+            .iterator(chunk_size=self.options['chunk_size'])
+        )
+        checked = 0
+        for chunk in chunked(rows, self.options['chunk_size']):
+            names = [image for _, image, _ in chunk]
+            variants = [variant_paths(v) for _, _, v in chunk]
+            referenced.update(names)
+            for paths in variants:
+                referenced.update(paths)
+            image_ok = list(self.pool.map(self.exists, names))
+            for (pk, image, _), ok, paths in zip(chunk, image_ok, variants):
+                if not ok:
+                    broken.append((pk, image))
+                elif paths and not all(self.pool.map(self.exists, paths)):
+                    stale.append(pk)
+            checked += len(chunk)
+            if self.verbosity >= 2:
+                self.stdout.write(f'Checked {checked:,} product images...')
+
+        self.stdout.write(f'{checked:,} product images checked: {len(broken):,} missing, '
+                          f'{len(stale):,} with missing variants.')
+        self.list_items(f'{pk}: {image}' for pk, image in broken)
+
+        if self.options['fix_broken'] and (broken or stale):
+            if self.options['dry_run']:
+                self.stdout.write(f'Would clear {len(broken):,} image references and reset '
+                                  f'{len(stale):,} variant sets.')
+            else:
+                for batch in chunked((pk for pk, _ in broken), self.options['batch_size']):
+                    Product.objects.filter(pk__in=batch).update(image='', image_variants={})
+                # An empty variant set is stale, so generate_image_variants rebuilds it.
+                for batch in chunked(stale, self.options['batch_size']):
+                    Product.objects.filter(pk__in=batch).update(image_variants={})
+                bump_catalog_version()
+                self.stdout.write(self.style.SUCCESS(
+                    f'Cleared {len(broken):,} image references and reset {len(stale):,} variant sets.'
+                ))
+                if stale:
+                    self.stdout.write('Run generate_image_variants to rebuild the reset variants.')
+        return referenced
+
+    def walk(self, directory):
+        """Yield ``os.DirEntry`` objects for every file below ``directory``."""
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self.walk(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            return
+
+    def check_orphans(self, referenced):
+        """Walk the product media directory and find files nothing references."""
+        cutoff = time.time() - self.options['min_age'] * 3600
+        orphans = []
+        orphan_bytes = scanned = 0
+        for chunk in chunked(self.walk(os.path.join(self.root, self.options['directory'])), self.options['chunk_size']):
+            candidates = [
+                entry for entry in chunk
+                if os.path.relpath(entry.path, self.root).replace(os.sep, '/') not in referenced
+            ]
+            # stat() is a syscall per file (or a round trip on network storage).
+            for entry, stat in zip(candidates, self.pool.map(lambda e: e.stat(follow_symlinks=False), candidates)):
+                # Skip recent uploads whose product row may not be committed yet.
+                if stat.st_mtime < cutoff:
+                    orphans.append(os.path.relpath(entry.path, self.root).replace(os.sep, '/'))
+                    orphan_bytes += stat.st_size
+            scanned += len(chunk)
+            if self.verbosity >= 2:
+                self.stdout.write(f'Scanned {scanned:,} files...')
+
+        self.stdout.write(f'{scanned:,} files scanned: {len(orphans):,} orphaned ({format_bytes(orphan_bytes)}).')
+        self.list_items(orphans)
+
+        if not self.options['delete_orphans'] or not orphans:
+            return
+        if self.options['dry_run']:
+            self.stdout.write(f'Would delete {len(orphans):,} files ({format_bytes(orphan_bytes)}).')
+            return
+        deleted = 0
+        for batch in chunked(orphans, self.options['batch_size']):
+            for name in batch:
+                default_storage.delete(name)
+            deleted += len(batch)
+            if self.verbosity >= 2:
+                self.stdout.write(f'Deleted {deleted:,} of {len(orphans):,} files...')
+            if self.options['sleep']:
+                time.sleep(self.options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted:,} orphaned files ({format_bytes(orphan_bytes)}).'))
+
+    def list_items(self, items):
+        limit = None if self.verbosity >= 2 else MAX_LISTED
+        items = list(islice(items, limit + 1 if limit else None))
+        for item in items[:limit]:
+            self.stdout.write(f'  {item}')
+        if limit and len(items) > limit:
+            self.stdout.write('  ... (use -v 2 to list all)')
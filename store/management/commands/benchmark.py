@@ -0,0 +1,96 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from store.benchmark import SCENARIOS, Fixtures, run_scenario
+
+class Command(BaseCommand):
+    help = 'Measure latency percentiles, throughput and queries per request for the main store views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                            help='Scenario to run (repeatable; default: all)')
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per worker before measuring')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients')
+        parser.add_argument('--url', help='Benchmark a running server (e.g. http://127.0.0.1:8000) instead of in-process')
+        parser.add_argument('--no-cache', action='store_true', help='Run in-process with the dummy cache backend')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', dest='json_path', help='Write the results to this JSON file')
+        parser.add_argument('--compare', help='Show the change against a previous --json result')
+
+    def handle(self, *args, **options):
+        try:
+            fixtures = Fixtures()
+        except ValueError as exc:
+            raise CommandError(exc)
+        names = options['scenario'] or list(SCENARIOS)
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if options['no_cache']:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        results = {}
+        with override_settings(**overrides):
+            for name in names:
+                self.stdout.write(f'Running {name}...', ending='\r')
+                results[name] = run_scenario(
+                    name, fixtures, requests=options['requests'], concurrency=options['concurrency'],
+                    warmup=options['warmup'], base_url=options['url'], seed=options['seed'],
+                )
+
+        baseline = {}
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)['scenarios']
+        self.print_table(results, baseline)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump({'meta': self.metadata(options), 'scenarios': results}, fh, indent=2)
+            self.stdout.write(f'Results written to {options["json_path"]}')
+
+    def print_table(self, results, baseline):
+        header = f'{"scenario":<16} {"reqs":>5} {"err":>4} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8}'
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, result in results.items():
+            latency = result['latency_ms']
+            queries = result['queries']['mean']
+            line = (
+                f'{name:<16} {result["requests"]:>5} {result["errors"]:>4} {result["throughput"] or 0:>8.1f} '
+                f'{latency["p50"]:>8.2f} {latency["p95"]:>8.2f} {latency["p99"]:>8.2f} '
+                f'{"-" if queries is None else f"{queries:.1f}":>8}'
+            )
+            previous = baseline.get(name)
+            if previous and previous['latency_ms']['p95']:
+                change = (latency['p95'] - previous['latency_ms']['p95']) / previous['latency_ms']['p95'] * 100
+                line += f'  p95 {change:+.0f}%'
+            style = self.style.ERROR if result['errors'] else (lambda text: text)
+            self.stdout.write(style(line))
+
+    def metadata(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=settings.BASE_DIR,
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': commit,
+            'target': options['url'] or 'in-process',
+            'database': connection.vendor,
+            'cache': 'dummy' if options['no_cache'] else settings.CACHES['default']['BACKEND'],
+            'debug': settings.DEBUG,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'seed': options['seed'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        }
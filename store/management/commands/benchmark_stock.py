@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.utils.crypto import get_random_string
+from store.inventory import OutOfStock, reserve
+from store.models import Cart, Category, Product
+
+class Command(BaseCommand):
+    help = 'Stress stock reservation with parallel workers and check nothing is oversold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stock', type=int, default=500, help='Units on hand for the test product')
+        parser.add_argument('--workers', type=int, default=16, help='Concurrent worker threads')
+        parser.add_argument('--attempts', type=int, default=1000, help='Total reservation attempts')
+        parser.add_argument('--quantity', type=int, default=1, help='Units per reservation')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows')
+
+    def handle(self, *args, **options):
+        suffix = get_random_string(8).lower()
+        category = Category.objects.create(name=f'Benchmark {suffix}', slug=f'benchmark-{suffix}')
+        product = Product.objects.create(
+            category=category, name=f'Benchmark product {suffix}', slug=f'benchmark-{suffix}',
+            price=1, stock=options['stock'],
+        )
+        carts = Cart.objects.bulk_create([Cart() for _ in range(options['workers'])])
+        attempts_per_worker = max(1, options['attempts'] // options['workers'])
+
+        def worker(cart):
+            results = {'ok': 0, 'out_of_stock': 0, 'errors': 0}
+            try:
+                for _ in range(attempts_per_worker):
+                    try:
+                        reserve(cart, product, options['quantity'])
+                        results['ok'] += 1
+                    except OutOfStock:
+                        results['out_of_stock'] += 1
+                    except OperationalError:
+                        # e.g. "database is locked" on SQLite under heavy contention
+                        results['errors'] += 1
+            finally:
+                connections.close_all()
+            return results
+
+        self.stdout.write(
+            f'Running {attempts_per_worker * len(carts)} reservations of {options["quantity"]} '
+            f'against stock {options["stock"]} with {len(carts)} workers...'
+        )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(carts)) as pool:
+            results = list(pool.map(worker, carts))
+        elapsed = time.perf_counter() - start
+
+        totals = {key: sum(r[key] for r in results) for key in results[0]}
+        product.refresh_from_db()
+        attempts = sum(totals.values())
+        self.stdout.write(f'Elapsed: {elapsed:.2f}s ({attempts / elapsed:.0f} reservations/s)')
+        self.stdout.write(
+            f'Succeeded: {totals["ok"]}, out of stock: {totals["out_of_stock"]}, errors: {totals["errors"]}'
+        )
+        self.stdout.write(f'Stock: {product.stock}, reserved: {product.reserved}')
+
+        oversold = product.reserved > product.stock
+        consistent = product.reserved == totals['ok'] * options['quantity']
+        if not options['keep']:
+            category.delete()
+            Cart.objects.filter(pk__in=[c.pk for c in carts]).delete()
+        if oversold or not consistent:
+            self.stdout.write(self.style.ERROR('Stock accounting is inconsistent!'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No overselling detected.'))
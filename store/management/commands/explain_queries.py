@@ -0,0 +1,117 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from store.models import Category, Product
+from store.queries import QueryCounter
+
+# Plan lines that mean a whole table is read row by row.
+FULL_SCAN_PATTERNS = {
+    # "SCAN store_product" but not "SCAN ... USING [COVERING] INDEX" or FTS lookups
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)(\S+)(?!.*\b(USING|VIRTUAL TABLE)\b)'),
+    'postgresql': re.compile(r'Seq Scan on (\S+)'),
+    'mysql': re.compile(r'\btype\W+ALL\b'),
+}
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN over every query issued by the store's views and report full table scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to log in as for order history (default: first user)')
+        parser.add_argument('--ignore-table', action='append', default=[],
+                            help='Do not report scans of this table (repeatable), e.g. store_category')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every query')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if any full scan is found')
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor not in EXPLAIN_PREFIX:
+            raise CommandError(f'EXPLAIN is not supported for {connection.vendor}.')
+        self.connection = connection
+        self.pattern = FULL_SCAN_PATTERNS[connection.vendor]
+        self.ignored = set(options['ignore_table'])
+        self.verbose_plans = options['verbose_plans']
+
+        # Bypass the catalog cache so every view really hits the database.
+        with override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            ALLOWED_HOSTS=['testserver'],
+        ):
+            scans = self.explain_views(options['user'])
+
+        if scans:
+            message = f'{scans} queries read a full table.'
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans found.'))
+
+    def urls(self):
+        urls = [reverse('store:product_list')]
+        urls += [f"{reverse('store:product_list')}?sort={s}" for s in ('price_low', 'price_high', 'newest')]
+        product = Product.objects.filter(available=True).first()
+        if product:
+            urls.append(f"{reverse('store:product_list')}?search={product.name.split()[0]}")
+            urls.append(product.get_absolute_url())
+        category = Category.objects.first()
+        if category:
+            urls.append(category.get_absolute_url())
+            urls.append(f'{category.get_absolute_url()}?sort=price_low')
+            urls.append(f"{reverse('store:api_products')}?category={category.slug}")
+        urls += [reverse('store:api_products'), reverse('store:cart_detail'), reverse('store:api_cart_status')]
+        return urls
+
+    def explain_views(self, username):
+        client = Client()
+        scans = 0
+        for url in self.urls():
+            scans += self.explain_url(client, url)
+
+        users = User.objects.filter(username=username) if username else User.objects.order_by('pk')
+        user = users.first()
+        if user is None:
+            self.stdout.write('No user found; skipping order history.')
+            return scans
+        client.force_login(user)
+        for url in (reverse('users:order_history'), reverse('store:cart_detail'), reverse('store:api_cart_status')):
+            scans += self.explain_url(client, url, label=f'{url} (as {user.username})')
+        return scans
+
+    def explain_url(self, client, url, label=None):
+        with QueryCounter() as counter:
+            response = client.get(url)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{label or url}: HTTP {response.status_code}, {counter.count} queries'
+        ))
+        scans = 0
+        for sql, params in zip(counter.queries, counter.params):
+            if not sql.lstrip().upper().startswith('SELECT') or params is None:
+                continue
+            plan = self.explain(sql, params)
+            # Scanning a subquery SQLite has already materialized is not a table read.
+            derived = {line.split()[-1] for line in plan if 'CO-ROUTINE' in line or 'MATERIALIZE' in line}
+            tables = [m.group(1).strip('"`') for line in plan for m in [self.pattern.search(line)] if m]
+            tables = [t for t in tables if t not in self.ignored and t not in derived]
+            if tables:
+                scans += 1
+                self.stdout.write(self.style.WARNING(f'  full scan of {", ".join(tables)}: {sql[:200]}'))
+            if tables or self.verbose_plans:
+                for line in plan:
+                    self.stdout.write(f'    {line}')
+        return scans
+
+    def explain(self, sql, params):
+        with self.connection.cursor() as cursor:
+            cursor.execute(EXPLAIN_PREFIX[self.connection.vendor] + sql, params)
+            rows = cursor.fetchall()
+        return [' '.join(str(col) for col in row) for row in rows]
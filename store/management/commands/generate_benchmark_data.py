@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from store.benchmark import clear_data, generate_data
+
+class Command(BaseCommand):
+    help = 'Create (or remove) a reproducible synthetic dataset for the benchmark command'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--carts', type=int, default=50, help='Users that get a filled cart')
+        parser.add_argument('--orders', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--clear', action='store_true', help='Only delete previously generated data')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Removing previous benchmark data...')
+        clear_data()
+        if options['clear']:
+            return
+        counts = generate_data(
+            categories=options['categories'], products=options['products'], users=options['users'],
+            carts=min(options['carts'], options['users']), orders=options['orders'], seed=options['seed'],
+            log=lambda message: self.stdout.write(f'  {message}'),
+        )
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary}.'))
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from store.cache import bump_catalog_version
+from store.images import update_variants, variants_stale
+from store.models import Product
+
+class Command(BaseCommand):
+    help = 'Generate responsive thumbnails and WebP/AVIF variants for existing product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are already up to date')
+        parser.add_argument('--workers', type=int, default=4, help='Images processed in parallel')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many products need variants')
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').only('pk', 'image', 'image_variants')
+        pending = [p for p in products.iterator() if options['force'] or variants_stale(p)]
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(pending)} products need image variants.')
+            return
+
+        if options['force']:
+            for product in pending:
+                # Make update_variants treat every product as stale.
+                product.image_variants = {**(product.image_variants or {}), 'source': None}
+
+        done = failed = 0
+        # Pillow releases the GIL while decoding, resizing and encoding.
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for product, error in pool.map(self.process, pending):
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{product.image.name}: {error}')
+                else:
+                    done += 1
+
+        if done:
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {done} products ({failed} failed).'))
+
+    def process(self, product):
+        try:
+            update_variants(product)
+            return product, None
+        except OSError as exc:
+            return product, exc
+        finally:
+            close_old_connections()
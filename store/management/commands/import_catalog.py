@@ -0,0 +1,174 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+from store.cache import bump_catalog_version
+from store.cart import refresh_summaries
+from store.feeds import RowError, clean_rows, detect_format, open_feed, read_chunks
+from store.models import Cart, Category, Product
+from store.search import get_backend
+
+# Feed columns that map straight onto Product fields.
+PRODUCT_FIELDS = ('name', 'price', 'description', 'available', 'stock', 'image')
+MAX_REPORTED_ERRORS = 20
+
+
+class CategoryMap:
+    """Resolve feed category names/slugs to ids from an in-memory map."""
+
+    def __init__(self, create=False, dry_run=False):
+        self.create = create
+        self.dry_run = dry_run
+        self.created = []
+        self.ids = {}
+        for pk, slug, name in Category.objects.values_list('pk', 'slug', 'name'):
+            self.ids[slug] = pk
+            self.ids.setdefault(name.lower(), pk)
+
+    def resolve(self, value):
+        key = value.lower()
+        pk = self.ids.get(key) or self.ids.get(slugify(value))
+        if pk is not None:
+            return pk
+        if not self.create:
+            raise RowError(f'unknown category {value!r}')
+        slug = slugify(value)[:50]
+        if not slug:
+            raise RowError(f'invalid category {value!r}')
+        if self.dry_run:
+            pk = -len(self.created) - 1
+        else:
+            pk = Category.objects.get_or_create(slug=slug, defaults={'name': value[:100]})[0].pk
+        self.created.append(value)
+        self.ids[key] = self.ids[slug] = pk
+        return pk
+
+
+class Command(BaseCommand):
+    help = 'Create or update products in bulk from a CSV or NDJSON feed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV/NDJSON file, or - for stdin')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows upserted per statement')
+        parser.add_argument('--workers', type=int, default=0, help='Processes parsing/validating rows (0 = inline)')
+        parser.add_argument('--create-categories', action='store_true', help='Create categories missing from the map')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the feed without writing anything')
+        parser.add_argument('--max-errors', type=int, help='Abort once this many rows have been rejected')
+        parser.add_argument('--progress-every', type=int, default=50000, help='Rows between progress reports')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        self.dry_run = options['dry_run']
+        self.max_errors = options['max_errors']
+        self.categories = CategoryMap(options['create_categories'], self.dry_run)
+        self.error_count = 0
+        imported = seen = 0
+        next_report = options['progress_every']
+        started = time.monotonic()
+
+        try:
+            with open_feed(path) as fh:
+                chunks = read_chunks(fh, fmt, options['batch_size'])
+                for cleaned, errors in self.clean(chunks, options['workers']):
+                    seen += len(cleaned) + len(errors)
+                    self.report_errors(errors)
+                    imported += self.upsert(cleaned)
+                    if seen >= next_report:
+                        next_report += options['progress_every']
+                        self.progress(seen, imported, started)
+        except OSError as exc:
+            raise CommandError(exc)
+        except RowError as exc:
+            raise CommandError(exc)
+        finally:
+            if imported and not self.dry_run:
+                # bulk_create skips post_save, so do the signal handlers' work once.
+                bump_catalog_version()
+                get_backend().rebuild()
+
+        elapsed = time.monotonic() - started
+        verb = 'Validated' if self.dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {imported:,} of {seen:,} rows in {elapsed:.1f}s '
+            f'({seen / elapsed if elapsed else 0:,.0f} rows/s); {self.error_count:,} rejected.'
+        ))
+        if self.categories.created:
+            action = 'Would create' if self.dry_run else 'Created'
+            self.stdout.write(f'{action} {len(self.categories.created)} categories.')
+        if imported and not self.dry_run:
+            self.stdout.write('Run generate_image_variants if the feed set new images.')
+
+    def clean(self, chunks, workers):
+        """Yield ``clean_rows`` results in feed order, optionally from a process pool."""
+        if workers <= 0:
+            for first_row, rows in chunks:
+                yield clean_rows(first_row, rows)
+            return
+        # Spawned children only import store.feeds; no Django setup needed.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            # Bound the chunks in flight so the feed is never read ahead into memory.
+            pending = deque()
+            for first_row, rows in chunks:
+                pending.append(pool.submit(clean_rows, first_row, rows))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def report_errors(self, errors):
+        for number, message in errors:
+            self.error_count += 1
+            if self.error_count <= MAX_REPORTED_ERRORS:
+                self.stderr.write(f'Row {number}: {message}')
+            elif self.error_count == MAX_REPORTED_ERRORS + 1:
+                self.stderr.write('Further errors are counted but not shown.')
+        if self.max_errors is not None and self.error_count > self.max_errors:
+            raise CommandError(f'Aborting after {self.error_count} rejected rows.')
+
+    def upsert(self, cleaned):
+        """Insert or update one batch of cleaned rows; returns how many were written."""
+        products = {}
+        errors = []
+        for number, row in cleaned:
+            try:
+                category_id = self.categories.resolve(row['category'])
+            except RowError as exc:
+                errors.append((number, str(exc)))
+                continue
+            # A slug repeated within a batch would hit the same row twice in one upsert.
+            products[row['slug']] = (row, category_id)
+        self.report_errors(errors)
+        if self.dry_run or not products:
+            return len(products)
+
+        # Rows only overwrite the columns they provide, so group them by column set.
+        by_columns = sorted(products.values(), key=lambda item: sorted(item[0]))
+        with transaction.atomic():
+            for columns, group in groupby(by_columns, key=lambda item: sorted(item[0])):
+                fields = [f for f in PRODUCT_FIELDS if f in columns]
+                Product.objects.bulk_create(
+                    [
+                        Product(slug=row['slug'], category_id=category_id, **{f: row[f] for f in fields})
+                        for row, category_id in group
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['slug'],
+                    update_fields=['category', *fields, 'updated'],
+                )
+            # Carts holding these products carry denormalized totals.
+            refresh_summaries(Cart.objects.filter(items__product__slug__in=list(products)))
+        return len(products)
+
+    def progress(self, seen, imported, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{seen:,} rows read, {imported:,} imported, {self.error_count:,} rejected '
+            f'({seen / elapsed if elapsed else 0:,.0f} rows/s)'
+        )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from store.inventory import release_carts
+from store.models import Cart
+
+class Command(BaseCommand):
+    help = 'Delete abandoned anonymous carts (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help='Delete anonymous carts not updated for this many days')
+        parser.add_argument('--empty-hours', type=int, default=24,
+                            help='Delete empty anonymous carts not updated for this many hours')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        abandoned = Cart.objects.filter(user=None).filter(
+            Q(updated__lt=now - timedelta(days=options['days']))
+            | Q(item_count=0, updated__lt=now - timedelta(hours=options['empty_hours']))
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'Would delete {abandoned.count()} abandoned carts.')
+            return
+
+        deleted = 0
+        while True:
+            ids = list(abandoned.values_list('pk', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                # Re-check under lock: a cart may have been used since it was selected.
+                ids = list(abandoned.select_for_update().filter(pk__in=ids).values_list('pk', flat=True))
+                # Give reserved stock back before the reservations cascade away.
+                release_carts(ids)
+                abandoned.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            self.stdout.write(f'Deleted {deleted} carts...')
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully deleted {deleted} abandoned carts.'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from store.inventory import release_expired_reservations
+
+class Command(BaseCommand):
+    help = 'Return stock held by expired cart reservations (run periodically, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        count = release_expired_reservations()
+        self.stdout.write(self.style.SUCCESS(f'Released {count} expired reservations.'))
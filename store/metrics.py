@@ -0,0 +1,238 @@
+"""
+Per-request performance metrics.
+
+``store.middleware.MetricsMiddleware`` opens a ``RequestMetrics`` for every
+request and stores it in a context variable. While it is active:
+
+- every SQL statement is timed by an execute wrapper installed on each new
+  database connection (``instrument_connection``), so queries run by async
+  views in ``sync_to_async`` threads are counted too;
+- the template backend in ``store.template_backends`` adds render time;
+- ``store.cache.cached_catalog`` records hits and misses.
+
+When the request finishes the totals are sent as a ``Server-Timing`` header
+(visible in the browser's network panel) if ``METRICS['SERVER_TIMING']`` is
+set, folded into in-process histograms
+per URL name that ``metrics_view`` exposes in the Prometheus text format,
+and slow requests are logged, with their slowest SQL, to the
+``store.slow_requests`` logger.
+
+Metrics are per process: with several workers, scrape each worker or put a
+Prometheus agent in front.
+"""
+import bisect
+import hmac
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger('store.slow_requests')
+
+# Request duration buckets in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+MAX_RECORDED_QUERIES = 200
+SLOW_LOG_QUERIES = 5
+
+DEFAULTS = {
+    'SERVER_TIMING': False,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_SAMPLE_RATE': 1.0,
+    'TOKEN': None,
+    'ALLOWED_IPS': ('127.0.0.1', '::1'),
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def config(name):
+    return getattr(settings, 'METRICS', {}).get(name, DEFAULTS[name])
+
+
+class RequestMetrics:
+    """Timings collected while handling one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = None
+        self.db_time = 0.0
+        self.db_count = 0
+        self.queries = []
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hit {self.cache_misses} miss"',
+            f'total;dur={self.total * 1000:.1f}',
+        ])
+
+
+def begin():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        metrics.db_time += duration
+        metrics.db_count += 1
+        if len(metrics.queries) < MAX_RECORDED_QUERIES:
+            metrics.queries.append((duration, sql))
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """``connection_created`` receiver timing every query on ``connection``."""
+    # The wrapper list outlives reconnects, so only install it once. Insert
+    # at the front: execute_wrapper() blocks active right now (e.g. a
+    # QueryCounter) pop the last entry when they exit.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def record_template(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.template_time += duration
+
+
+def record_cache(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class Registry:
+    """Thread-safe histograms and counters keyed by URL name."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, status, metrics):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = {
+                    'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0, 'statuses': {},
+                    'db_seconds': 0.0, 'queries': 0, 'template_seconds': 0.0,
+                    'cache_hits': 0, 'cache_misses': 0,
+                }
+            index = bisect.bisect_left(BUCKETS, metrics.total)
+            if index < len(BUCKETS):
+                stats['buckets'][index] += 1
+            stats['count'] += 1
+            stats['sum'] += metrics.total
+            status_class = f'{status // 100}xx'
+            stats['statuses'][status_class] = stats['statuses'].get(status_class, 0) + 1
+            stats['db_seconds'] += metrics.db_time
+            stats['queries'] += metrics.db_count
+            stats['template_seconds'] += metrics.template_time
+            stats['cache_hits'] += metrics.cache_hits
+            stats['cache_misses'] += metrics.cache_misses
+
+    def render(self):
+        """Render everything in the Prometheus text exposition format."""
+        with self.lock:
+            views = {view: {**stats, 'buckets': list(stats['buckets']), 'statuses': dict(stats['statuses'])}
+                     for view, stats in self.views.items()}
+        lines = [
+            '# HELP store_request_duration_seconds Time spent handling requests, by URL name.',
+            '# TYPE store_request_duration_seconds histogram',
+        ]
+        for view, stats in sorted(views.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS, stats['buckets']):
+                cumulative += count
+                lines.append(f'store_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+            lines.append(f'store_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'store_request_duration_seconds_sum{{view="{view}"}} {stats["sum"]:.6f}')
+            lines.append(f'store_request_duration_seconds_count{{view="{view}"}} {stats["count"]}')
+        counters = (
+            ('store_requests_total', 'Requests by URL name and status class.', None),
+            ('store_request_db_seconds_total', 'Time spent in SQL.', 'db_seconds'),
+            ('store_request_queries_total', 'SQL statements executed.', 'queries'),
+            ('store_request_template_seconds_total', 'Time spent rendering templates.', 'template_seconds'),
+            ('store_cache_requests_total', 'Catalog cache lookups by result.', None),
+        )
+        for name, help_text, field in counters:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for view, stats in sorted(views.items()):
+                if name == 'store_requests_total':
+                    for status, count in sorted(stats['statuses'].items()):
+                        lines.append(f'{name}{{view="{view}",status="{status}"}} {count}')
+                elif name == 'store_cache_requests_total':
+                    lines.append(f'{name}{{view="{view}",result="hit"}} {stats["cache_hits"]}')
+                    lines.append(f'{name}{{view="{view}",result="miss"}} {stats["cache_misses"]}')
+                else:
+                    value = stats[field]
+                    lines.append(f'{name}{{view="{view}"}} {value:.6f}' if isinstance(value, float)
+                                 else f'{name}{{view="{view}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = Registry()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else 'unmatched'
+
+
+def log_if_slow(request, response, metrics):
+    """Log a sample of requests slower than ``METRICS['SLOW_REQUEST_MS']``."""
+    if metrics.total * 1000 < config('SLOW_REQUEST_MS') or random.random() >= config('SLOW_SAMPLE_RATE'):
+        return
+    slowest = sorted(metrics.queries, reverse=True)[:SLOW_LOG_QUERIES]
+    queries = ''.join(f'\n  {duration * 1000:.1f}ms {sql[:500]}' for duration, sql in slowest)
+    logger.warning(
+        'Slow request %s %s (%s) %s: total %.0fms, db %.0fms in %d queries, templates %.0fms, '
+        'cache %d hit/%d miss%s',
+        request.method, request.get_full_path(), view_name(request), response.status_code,
+        metrics.total * 1000, metrics.db_time * 1000, metrics.db_count, metrics.template_time * 1000,
+        metrics.cache_hits, metrics.cache_misses, queries,
+    )
+
+
+def metrics_view(request):
+    """Expose the collected metrics to a Prometheus scraper."""
+    token = config('TOKEN')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied, token):
+            return HttpResponseForbidden()
+    elif request.META.get('REMOTE_ADDR') not in config('ALLOWED_IPS'):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,371 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.text import compress_sequence, compress_string
+from ecommerce_project.routers import begin_request, end_request
+
+from . import metrics
+from .cart import get_cart
+from .queries import QueryBudgetExceeded, QueryCounter
+from .serving import DEFAULT_STATIC_MAX_AGE, StaticFileIndex, accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger('store.queries')
+serving_logger = logging.getLogger('store.serving')
+
+# Content types worth compressing; images, fonts and archives already are.
+COMPRESSIBLE_TYPES = {
+    'application/javascript',
+    'application/json',
+    'application/ld+json',
+    'application/manifest+json',
+    'application/x-ndjson',
+    'application/xml',
+    'image/svg+xml',
+}
+# Responses shorter than this gain nothing from compression.
+MIN_COMPRESS_LENGTH = 200
+# Brotli quality for on-the-fly compression: 11 is for precompressed assets only.
+BROTLI_QUALITY = 5
+# Uncompressed bytes of a streamed response between brotli flushes.
+BROTLI_FLUSH_BYTES = 32 * 1024
+
+
+class StaticFilesMiddleware:
+    """
+    Serve ``collectstatic`` output when ``DEBUG`` is off.
+
+    Files are indexed once at start-up and answered before the rest of the
+    middleware stack runs (no session or database access). Hashed files are
+    cached for a year and precompressed ``.br``/``.gz`` siblings are sent to
+    clients that accept them. Put this directly after ``SecurityMiddleware``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        # runserver serves static files itself while DEBUG is on; a CDN
+        # (absolute STATIC_URL) means they never reach Django at all.
+        if settings.DEBUG or '://' in settings.STATIC_URL:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.files = StaticFileIndex(settings.STATIC_ROOT, settings.STATIC_URL)
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', DEFAULT_STATIC_MAX_AGE)
+        if not self.files:
+            serving_logger.warning('No static files in %s; run collectstatic.', settings.STATIC_ROOT)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        static_file = self.files.find(request.path_info)
+        return static_file.serve(request, self.max_age) if static_file else None
+
+
+class MetricsMiddleware:
+    """
+    Time each request's SQL, template rendering and cache lookups.
+
+    Adds a ``Server-Timing`` header (``METRICS['SERVER_TIMING']``), feeds the
+    per-URL-name histograms served at ``/metrics/`` and logs a sample of
+    slow requests with their slowest queries (see ``store.metrics``).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request_metrics, token = metrics.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end(token)
+        return self.record(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics, token = metrics.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end(token)
+        return self.record(request, response, request_metrics)
+
+    def record(self, request, response, request_metrics):
+        request_metrics.finish()
+        if metrics.config('SERVER_TIMING'):
+            response.headers['Server-Timing'] = request_metrics.server_timing()
+        metrics.registry.observe(metrics.view_name(request), response.status_code, request_metrics)
+        metrics.log_if_slow(request, response, request_metrics)
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress text responses (HTML, JSON, NDJSON exports, ...) with brotli or gzip.
+
+    Brotli is used when the ``brotli`` package is installed and the client
+    accepts it, otherwise gzip exactly as Django's ``GZipMiddleware`` does
+    (including its BREACH mitigation). Streaming responses are compressed
+    chunk by chunk so they keep streaming. File responses are left alone:
+    media is already compressed and they may carry byte ranges.
+    """
+    sync_capable = True
+    async_capable = True
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not self.should_compress(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accepted = accepted_encodings(request)
+        if brotli is not None and 'br' in accepted:
+            encoding, compress, compress_stream = 'br', self.brotli, self.brotli_stream
+        elif 'gzip' in accepted:
+            encoding, compress, compress_stream = 'gzip', self.gzip, self.gzip_stream
+        else:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, response.is_async)
+            # The compressed size isn't known until the stream has been sent.
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content)
+            # Return the compressed content only if it's actually shorter.
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag must not match the compressed representation (RFC 9110 8.8.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def should_compress(self, response):
+        if isinstance(response, FileResponse) or response.status_code == 206:
+            return False
+        if response.has_header('Content-Encoding'):
+            return False
+        if not response.streaming and len(response.content) < MIN_COMPRESS_LENGTH:
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        return content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES
+
+    def gzip(self, content):
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def gzip_stream(self, content, is_async):
+        if not is_async:
+            return compress_sequence(content, max_random_bytes=self.max_random_bytes)
+
+        async def stream():
+            async for chunk in content:
+                yield self.gzip(chunk)
+        return stream()
+
+    def brotli(self, content):
+        return brotli.compress(content, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+
+    def brotli_stream(self, content, is_async):
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+        pending = 0
+
+        def process(chunk):
+            # Every flush ends a brotli block, so flushing each chunk (one NDJSON
+            # row) would ruin the ratio; flush once enough input has built up.
+            nonlocal pending
+            data = compressor.process(chunk)
+            pending += len(chunk)
+            if pending >= BROTLI_FLUSH_BYTES:
+                pending = 0
+                data += compressor.flush()
+            return data
+
+        if not is_async:
+            def stream():
+                for chunk in content:
+                    data = process(chunk)
+                    if data:
+                        yield data
+                yield compressor.finish()
+            return stream()
+
+        async def astream():
+            async for chunk in content:
+                data = process(chunk)
+                if data:
+                    yield data
+            yield compressor.finish()
+        return astream()
+
+
+class QueryBudgetMiddleware:
+    """
+    Log (or raise) when a view runs more queries than its budget.
+
+    The budget comes from ``@query_budget(n)`` on the view, falling back to
+    ``QUERY_BUDGET['DEFAULT']``. Set ``QUERY_BUDGET['RAISE']`` to turn
+    overruns into errors during development.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = getattr(settings, 'QUERY_BUDGET', {})
+        self.default_budget = config.get('DEFAULT')
+        self.raise_on_exceed = config.get('RAISE', False)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        request.query_budget = self.default_budget
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        self.check_budget(request, counter)
+        return response
+
+    async def __acall__(self, request):
+        request.query_budget = self.default_budget
+        with QueryCounter() as counter:
+            response = await self.get_response(request)
+        self.check_budget(request, counter)
+        return response
+
+    def check_budget(self, request, counter):
+        budget = request.query_budget
+        if budget is not None and counter.count > budget:
+            message = (
+                f'{request.method} {request.path} ran {counter.count} queries '
+                f'(budget {budget})'
+            )
+            if self.raise_on_exceed:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = getattr(view_func, 'query_budget', None)
+        if budget is not None:
+            request.query_budget = budget
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Keep a browser on the primary database for a while after it writes.
+
+    Requests that write (as seen by ``ReplicaRouter.db_for_write``) set a
+    short-lived cookie; while it is present, ``@read_replica`` views read
+    from the primary so the visitor sees their cart, order or profile change
+    even if the replicas lag behind. Does nothing without replicas.
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'pin_primary'
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', ()):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state, token = begin_request(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state, token = begin_request(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class CartMiddleware:
+    """
+    Attach a lazy ``request.cart``.
+
+    The cart is looked up at most once per request, only if something reads
+    it, and never created here: anonymous visitors without a cart see an
+    unsaved empty cart until a view writes to it via
+    ``store.cart.get_cart(request, create=True)``.
+
+    Async views must not touch ``request.cart`` (it queries synchronously);
+    they use ``store.cart.aget_cart(request)`` instead.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.cart = SimpleLazyObject(lambda: get_cart(request))
+        # In async mode this hands back the coroutine for the handler to await.
+        return self.get_response(request)
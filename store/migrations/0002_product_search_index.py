@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Frozen copies of SQLiteFTS5Backend.create_table_sql()/drop_table_sql() in
+# store/search.py as of this migration. Migrations must not follow later edits
+# to app code, so a change to the FTS5 table definition needs a new migration
+# (and a matching change to store/search.py), not an edit here.
+CREATE_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS store_product_fts USING fts5("
+    "name, description, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+POPULATE_FTS_TABLE = (
+    "INSERT INTO store_product_fts (rowid, name, description) "
+    "SELECT id, name, description FROM store_product"
+)
+DROP_FTS_TABLE = "DROP TABLE IF EXISTS store_product_fts"
+
+
+def create_search_index(apps, schema_editor):
+    # The FTS5 index only exists on SQLite; other vendors use their own backend.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(CREATE_FTS_TABLE)
+    schema_editor.execute(POPULATE_FTS_TABLE)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(DROP_FTS_TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:47
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    """Fold duplicate (cart, product) lines into one before adding the constraint."""
+    CartItem = apps.get_model("store", "CartItem")
+    duplicates = (
+        CartItem.objects.values("cart", "product")
+        .annotate(lines=Count("id"), keep=Min("id"), quantity=Sum("quantity"))
+        .filter(lines__gt=1)
+    )
+    for group in duplicates:
+        CartItem.objects.filter(id=group["keep"]).update(quantity=group["quantity"])
+        CartItem.objects.filter(cart=group["cart"], product=group["product"]).exclude(
+            id=group["keep"]
+        ).delete()
+
+
+def populate_cart_summaries(apps, schema_editor):
+    Cart = apps.get_model("store", "Cart")
+    CartItem = apps.get_model("store", "CartItem")
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    lines = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    Cart.objects.update(
+        item_count=Coalesce(
+            Subquery(lines.annotate(total=Sum("quantity")).values("total")), 0
+        ),
+        subtotal=Coalesce(
+            Subquery(
+                lines.annotate(
+                    total=Sum(F("quantity") * F("product__price"), output_field=money)
+                ).values("total")
+            ),
+            models.Value(Decimal("0.00"), output_field=money),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0002_product_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="cart",
+            name="subtotal",
+            field=models.DecimalField(
+                decimal_places=2, default=Decimal("0.00"), max_digits=12
+            ),
+        ),
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.RunPython(populate_cart_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "product"), name="unique_cart_product"
+            ),
+        ),
+    ]
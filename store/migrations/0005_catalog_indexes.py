@@ -0,0 +1,75 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0004_stock"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cart",
+            index=models.Index(
+                condition=models.Q(("user__isnull", True)),
+                fields=["updated"],
+                name="cart_anon_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "-created"], name="order_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["name", "id"],
+                name="product_avail_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["price", "id"],
+                name="product_avail_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["created", "id"],
+                name="product_avail_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["category", "name", "id"],
+                name="product_cat_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["category", "price", "id"],
+                name="product_cat_price_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["category", "created", "id"],
+                name="product_cat_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0007_product_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["updated"], name="product_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "updated"], name="product_cat_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,113 @@
+"""
+Dependency-free CSS/JS minifiers used when collecting static files.
+
+Both are deliberately conservative: strings, template literals and regular
+expression literals are copied verbatim, and the JavaScript minifier keeps
+line breaks so automatic semicolon insertion behaves exactly as before.
+They remove comments and redundant whitespace, which is where nearly all
+of the savings in hand-written assets are.
+"""
+import re
+
+_CSS_STRING = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+
+
+def minify_css(text):
+    strings = []
+
+    def stash(match):
+        strings.append(match.group(0))
+        return f'\x00{len(strings) - 1}\x00'
+
+    text = _CSS_STRING.sub(stash, text)
+    text = _CSS_COMMENT.sub('', text)
+    text = re.sub(r'\s+', ' ', text)
+    # No space before ':' -- "a :hover" and "a:hover" are different selectors.
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    text = text.replace(';}', '}')
+    return re.sub(r'\x00(\d+)\x00', lambda m: strings[int(m.group(1))], text).strip() + '\n'
+
+
+# A '/' after one of these tokens (or at the start) begins a regex literal, not a division.
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw'}
+
+
+def _previous_token(out):
+    word = ''
+    for chunk in reversed(out):
+        if chunk in (' ', '\n'):
+            if word:
+                break
+            continue
+        if len(chunk) == 1 and (chunk.isalnum() or chunk in '_$'):
+            word = chunk + word
+            continue
+        return word or chunk[-1]
+    return word
+
+
+def _regex_allowed(out):
+    token = _previous_token(out)
+    return not token or token in _REGEX_PRECEDERS or token in _REGEX_KEYWORDS
+
+
+def minify_js(text):
+    out = []
+    i, n = 0, len(text)
+    pending_space = pending_newline = False
+
+    def emit(chunk):
+        nonlocal pending_space, pending_newline
+        if out:
+            if pending_newline:
+                out.append('\n')
+            elif pending_space and (out[-1][-1:].isalnum() or out[-1][-1:] in '_$') and (chunk[:1].isalnum() or chunk[:1] in '_$'):
+                out.append(' ')
+            elif pending_space and out[-1][-1:] in '+-' and chunk[:1] in '+-':
+                out.append(' ')
+        pending_space = pending_newline = False
+        out.append(chunk)
+
+    while i < n:
+        c = text[i]
+        if c in '"\'`':
+            j = i + 1
+            while j < n and text[j] != c:
+                j += 2 if text[j] == '\\' else 1
+            emit(text[i:j + 1])
+            i = j + 1
+        elif text.startswith('//', i):
+            j = text.find('\n', i)
+            i = n if j == -1 else j
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            pending_space = True
+        elif c == '/' and _regex_allowed(out):
+            j, in_class = i + 1, False
+            while j < n and (in_class or text[j] != '/') and text[j] != '\n':
+                if text[j] == '\\':
+                    j += 1
+                elif text[j] == '[':
+                    in_class = True
+                elif text[j] == ']':
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and text[j].isalpha():  # flags
+                j += 1
+            emit(text[i:j])
+            i = j
+        elif c.isspace():
+            if c == '\n':
+                pending_newline = True
+            else:
+                pending_space = True
+            i += 1
+        else:
+            emit(c)
+            i += 1
+    return ''.join(out).strip() + '\n'
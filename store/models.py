@@ -1,10 +1,18 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.urls import reverse
 
+MONEY = models.DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=MONEY)
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
+    updated = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = 'Categories'
@@ -20,22 +28,107 @@ class Product(models.Model):
     name = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     image = models.ImageField(upload_to='products/%Y/%m/%d', blank=True)
+    # Resized/re-encoded derivatives of ``image``, maintained by store.images.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     available = models.BooleanField(default=True)
+    # Units on hand; NULL means stock is not tracked for this product.
+    stock = models.PositiveIntegerField(null=True, blank=True)
+    # Units held by live cart reservations (see store.inventory).
+    reserved = models.PositiveIntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ('name',)
+        # Partial indexes matching the listing's query shapes: available
+        # products, optionally per category, in each sort order (id is the
+        # pagination tiebreaker; descending sorts scan these backwards).
+        indexes = [
+            models.Index(fields=['name', 'id'], condition=Q(available=True), name='product_avail_name_idx'),
+            models.Index(fields=['price', 'id'], condition=Q(available=True), name='product_avail_price_idx'),
+            models.Index(fields=['created', 'id'], condition=Q(available=True), name='product_avail_created_idx'),
+            models.Index(fields=['category', 'name', 'id'], condition=Q(available=True), name='product_cat_name_idx'),
+            models.Index(fields=['category', 'price', 'id'], condition=Q(available=True), name='product_cat_price_idx'),
+            models.Index(fields=['category', 'created', 'id'], condition=Q(available=True), name='product_cat_created_idx'),
+            # MAX(updated) for the conditional GET validators (store.conditional.catalog_state).
+            models.Index(fields=['updated'], name='product_updated_idx'),
+            models.Index(fields=['category', 'updated'], name='product_cat_updated_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
     def get_absolute_url(self):
         return reverse('store:product_detail', args=[self.slug])
+    
+    @property
+    def available_stock(self):
+        """Units that can still be reserved, or None if stock is not tracked."""
+        if self.stock is None:
+            return None
+        return max(self.stock - self.reserved, 0)
+    
+    @property
+    def in_stock(self):
+        return self.available and self.available_stock != 0
+
+class TotalsQuerySet(models.QuerySet):
+    """QuerySet computing item count and cost totals in SQL."""
+    # Expression for the cost of one item row, relative to the parent model.
+    item_cost = None
+
+    def with_totals(self):
+        """Annotate each row with ``total_quantity`` and ``total_cost``."""
+        return self.annotate(
+            total_quantity=Coalesce(Sum('items__quantity'), 0),
+            total_cost=Coalesce(Sum(self.item_cost, output_field=MONEY), ZERO),
+        )
+
+class OrderQuerySet(TotalsQuerySet):
+    item_cost = F('items__price') * F('items__quantity')
+
+class CartQuerySet(TotalsQuerySet):
+    item_cost = F('items__product__price') * F('items__quantity')
+
+class TotalsMixin:
+    """
+    Item count and cost for models with an ``items`` relation.
+
+    Totals come from a ``with_totals()`` annotation or prefetched items when
+    available, otherwise from one aggregate query cached on the instance.
+    """
+
+    def _load_totals(self):
+        if hasattr(self, 'total_cost'):
+            return
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('items')
+        if prefetched is not None:
+            self.total_quantity = sum(item.quantity for item in prefetched)
+            self.total_cost = sum((item.get_cost() for item in prefetched), Decimal('0.00'))
+        else:
+            totals = type(self).objects.filter(pk=self.pk).with_totals().values(
+                'total_quantity', 'total_cost'
+            ).get()
+            self.total_quantity = totals['total_quantity']
+            self.total_cost = totals['total_cost']
+
+    def clear_totals(self):
+        """Forget cached totals after the items have changed."""
+        for attr in ('total_quantity', 'total_cost'):
+            self.__dict__.pop(attr, None)
+
+    def get_total_quantity(self):
+        self._load_totals()
+        return self.total_quantity
+
+    def get_total_cost(self):
+        self._load_totals()
+        # SQLite returns SQL-computed decimals unquantized.
+        return Decimal(self.total_cost).quantize(Decimal('0.01'))
 
-class Order(models.Model):
+class Order(TotalsMixin, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
@@ -47,14 +140,16 @@ class Order(models.Model):
     updated = models.DateTimeField(auto_now=True)
     paid = models.BooleanField(default=False)
     
+    objects = OrderQuerySet.as_manager()
+    
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(fields=['user', '-created'], name='order_user_created_idx'),
+        ]
     
     def __str__(self):
         return f'Order {self.id}'
-    
-    def get_total_cost(self):
-        return sum(item.get_cost() for item in self.items.all())
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
@@ -72,20 +167,54 @@ class Cart(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    # Denormalized summary, maintained by store.cart on every item change.
+    item_count = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    
+    objects = CartQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Finds abandoned anonymous carts for purge_carts.
+            models.Index(fields=['updated'], condition=Q(user__isnull=True), name='cart_anon_updated_idx'),
+        ]
     
     def __str__(self):
         return f'Cart {self.id}'
     
+    def get_total_quantity(self):
+        return self.item_count
+    
     def get_total_cost(self):
-        return sum(item.get_cost() for item in self.items.all())
+        return self.subtotal
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
     
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+    
     def __str__(self):
         return f'{self.quantity}x {self.product.name}'
     
     def get_cost(self):
-        return self.product.price * self.quantity
\ No newline at end of file
+        return self.product.price * self.quantity
+
+class StockReservation(models.Model):
+    """Units of a product held for a cart until ``expires_at``."""
+    cart = models.ForeignKey(Cart, related_name='reservations', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name='reservations', on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product_reservation'),
+        ]
+    
+    def __str__(self):
+        return f'{self.quantity}x {self.product_id} for cart {self.cart_id}'
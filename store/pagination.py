@@ -0,0 +1,206 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by an opaque cursor holding the sort-key values of the
+row at the page edge, so fetching page N costs the same index range scan as
+page 1 and no ``COUNT(*)`` is needed to navigate.
+"""
+import base64
+import binascii
+import datetime
+import json
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor cannot be decoded or does not match the ordering."""
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder keeping full microsecond precision for datetimes."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def get_page_size(request, param='page_size'):
+    """Read a page size from the query string, bounded by ``STORE_MAX_PAGE_SIZE``."""
+    default = getattr(settings, 'STORE_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    maximum = getattr(settings, 'STORE_MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+    try:
+        size = int(request.GET.get(param, default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def estimate_count(queryset, limit=1000):
+    """
+    Count ``queryset`` without scanning past ``limit`` rows.
+
+    Returns ``(count, exact)``; when more than ``limit`` rows match, ``count``
+    is ``limit`` and ``exact`` is False.
+    """
+    count = queryset.order_by()[:limit + 1].count()
+    if count > limit:
+        return limit, False
+    return count, True
+
+
+async def aestimate_count(queryset, limit=1000):
+    """Async version of ``estimate_count``."""
+    count = await queryset.order_by()[:limit + 1].acount()
+    if count > limit:
+        return limit, False
+    return count, True
+
+
+def cursor_querystring(request, cursor):
+    """Return the current query string with ``cursor`` replaced."""
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return '?' + params.urlencode()
+
+
+class KeysetPage:
+    """A single page of results plus the cursors of its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by the given ``ordering``.
+
+    ``ordering`` is a sequence of field names (``-`` prefix for descending)
+    whose combination must be unique; end it with ``id``/``-id`` as tiebreaker.
+    """
+
+    def __init__(self, queryset, ordering, page_size=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.fields = [(f.lstrip('-'), f.startswith('-')) for f in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, name) for name, _ in self.fields]
+        payload = json.dumps({'o': self.ordering, 'd': direction, 'v': values}, cls=CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            ordering, direction, raw_values = payload['o'], payload['d'], payload['v']
+        except (ValueError, TypeError, KeyError, binascii.Error):
+            raise InvalidCursor('Malformed cursor.')
+        if (
+            not isinstance(ordering, list) or tuple(ordering) != self.ordering
+            or direction not in ('n', 'p')
+            or not isinstance(raw_values, list) or len(raw_values) != len(self.fields)
+        ):
+            raise InvalidCursor('Cursor does not match the requested ordering.')
+        return direction, [self._to_python(name, value) for (name, _), value in zip(self.fields, raw_values)]
+
+    def _to_python(self, name, value):
+        # Cursors only ever hold scalars, and no sort key is nullable.
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise InvalidCursor('Invalid cursor value.')
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations such as ``search_rank`` are plain floats.
+            field = None
+        try:
+            if field is None:
+                value = float(value)
+            else:
+                value = field.to_python(value)
+                field.run_validators(value)
+            if value is None or (isinstance(value, (float, Decimal)) and not math.isfinite(value)):
+                raise ValueError
+            # Database drivers reject integers wider than 64 bits.
+            if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+                raise ValueError
+        except (ValidationError, TypeError, ValueError, ArithmeticError):
+            raise InvalidCursor('Invalid cursor value.')
+        return value
+
+    def _seek(self, values, backwards):
+        """Build the row-value comparison ``(f1, f2, ...) > (v1, v2, ...)`` as a Q."""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != backwards else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[i]})
+            for j, (prev_name, _) in enumerate(self.fields[:i]):
+                clause &= Q(**{prev_name: values[j]})
+            condition |= clause
+        return condition
+
+    def _page_queryset(self, cursor):
+        """Return the query for the page after/before ``cursor`` and whether it runs backwards."""
+        queryset = self.queryset
+        backwards = False
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            backwards = direction == 'p'
+            queryset = queryset.filter(self._seek(values, backwards))
+        if backwards:
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in self.ordering]
+        else:
+            ordering = self.ordering
+        return queryset.order_by(*ordering)[:self.page_size + 1], backwards
+
+    def _build_page(self, rows, cursor, backwards):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], 'n') if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], 'p') if rows and has_previous else None,
+        )
+
+    def get_page(self, cursor=None):
+        queryset, backwards = self._page_queryset(cursor)
+        return self._build_page(list(queryset), cursor, backwards)
+
+    async def aget_page(self, cursor=None):
+        """Async version of ``get_page`` for async views."""
+        queryset, backwards = self._page_queryset(cursor)
+        return self._build_page([row async for row in queryset], cursor, backwards)
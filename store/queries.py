@@ -0,0 +1,70 @@
+"""
+Query-count budgets.
+
+``QueryCounter`` hooks every database connection via ``execute_wrapper`` so
+it works with ``DEBUG`` off. Views can declare a budget with
+``@query_budget(n)``; ``store.middleware.QueryBudgetMiddleware`` enforces it
+at runtime and ``assert_max_queries`` enforces it in tests.
+"""
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a block of code runs more queries than its budget allows."""
+
+
+class QueryCounter:
+    """Context manager recording the SQL executed on every connection."""
+
+    def __init__(self):
+        self.queries = []
+        self.params = []
+        self._stack = None
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        self.params.append(None if many else params)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of queries a view may run per request."""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+@contextmanager
+def assert_max_queries(max_queries):
+    """
+    Fail if the enclosed block runs more than ``max_queries`` queries.
+
+    Usage in tests::
+
+        with assert_max_queries(5):
+            self.client.get(reverse('store:cart_detail'))
+    """
+    with QueryCounter() as counter:
+        yield counter
+    if counter.count > max_queries:
+        executed = '\n'.join(f'{i}. {sql}' for i, sql in enumerate(counter.queries, 1))
+        raise AssertionError(
+            f'{counter.count} queries executed, budget is {max_queries}:\n{executed}'
+        )
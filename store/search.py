@@ -0,0 +1,159 @@
+"""
+Full-text product search.
+
+Search goes through a pluggable backend so the views never build LIKE
+scans themselves. The default on SQLite is an FTS5 inverted index kept in
+sync with ``Product`` by the handlers in ``store.signals``; other databases
+fall back to ``DatabaseSearchBackend`` until a native backend is configured
+with the ``STORE_SEARCH_BACKEND`` setting.
+"""
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Product
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a raw search string into lower-cased word tokens."""
+    return [token.lower() for token in TOKEN_RE.findall(query or '')]
+
+
+class BaseSearchBackend:
+    """Interface implemented by every search backend."""
+
+    def search(self, queryset, query):
+        """
+        Restrict ``queryset`` to products matching ``query``.
+
+        The result is annotated with ``search_rank`` (higher is better).
+        """
+        raise NotImplementedError
+
+    def index(self, products):
+        """Add or refresh the given products in the index."""
+
+    def remove(self, product_ids):
+        """Drop the given product ids from the index."""
+
+    def rebuild(self):
+        """Rebuild the whole index from the product table."""
+
+    def no_results(self, queryset):
+        """Empty result for a query without searchable terms, still ranked like a match."""
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Fallback backend using plain ``icontains`` lookups (no index)."""
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return self.no_results(queryset)
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """Inverted index stored in an SQLite FTS5 virtual table, ranked by BM25."""
+
+    table = 'store_product_fts'
+    # Relative BM25 weights of the indexed columns (name, description).
+    weights = (10.0, 1.0)
+
+    def _connection(self):
+        # Only index writes use this; searches run through the queryset's own database.
+        return connections[router.db_for_write(Product)]
+
+    @classmethod
+    def create_table_sql(cls):
+        return (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.table} USING fts5("
+            f"name, description, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    @classmethod
+    def drop_table_sql(cls):
+        return f'DROP TABLE IF EXISTS {cls.table}'
+
+    def match_expression(self, query):
+        """Build an FTS5 MATCH expression with prefix matching on every term."""
+        return ' '.join(f'"{term}"*' for term in tokenize(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return self.no_results(queryset)
+        product_table = Product._meta.db_table
+        weights = ', '.join(str(w) for w in self.weights)
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25({self.table}, {weights}) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND rowid = {product_table}.id',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def index(self, products):
+        rows = [(p.pk, p.name, p.description) for p in products]
+        if not rows:
+            return
+        with self._connection().cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, name, description) VALUES (%s, %s, %s)', rows
+            )
+
+    def remove(self, product_ids):
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        with self._connection().cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in product_ids])
+
+    def rebuild(self):
+        product_table = Product._meta.db_table
+        with self._connection().cursor() as cursor:
+            cursor.execute(self.create_table_sql())
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, name, description) '
+                f'SELECT id, name, description FROM {product_table}'
+            )
+            # Merge the index b-trees after a bulk load.
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured search backend instance (cached per process)."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'STORE_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        # Replicas share the primary's vendor. Asking the router for a write
+        # alias would mark the request as a writer and pin it to the primary.
+        elif connections[DEFAULT_DB_ALIAS].vendor == 'sqlite':
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = DatabaseSearchBackend()
+    return _backend
+
+
+def search_products(queryset, query):
+    """Filter and rank ``queryset`` by ``query`` using the active backend."""
+    return get_backend().search(queryset, query)
@@ -0,0 +1,222 @@
+"""
+Serving static and media files without a separate web server.
+
+``StaticFileIndex`` scans ``STATIC_ROOT`` once at start-up (as WhiteNoise
+does) and serves files straight from that index: content-hashed names from
+the ``collectstatic`` manifest are cached for a year, and the precompressed
+``.br``/``.gz`` siblings written by ``store.storage`` are chosen according to
+``Accept-Encoding``, so nothing is compressed per request.
+
+``serve_media`` serves uploads with conditional and ``Range`` requests
+(video seeking, resumed downloads), or hands the transfer off to the front
+server with ``X-Sendfile`` (Apache/lighttpd) or ``X-Accel-Redirect`` (nginx)
+depending on ``MEDIA_SERVE_MODE``.
+"""
+import json
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_STATIC_MAX_AGE = 60
+DEFAULT_MEDIA_MAX_AGE = 60 * 60 * 24
+CHUNK_SIZE = 64 * 1024
+
+# Preference order when a client accepts several encodings.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def accepted_encodings(request):
+    """Return the content codings the client accepts (ignoring those with q=0)."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if re.search(r'q\s*=\s*0(\.0*)?\s*$', params):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _etag(stat, suffix=''):
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}{suffix}"'
+
+
+def parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range against a file of ``size`` bytes.
+
+    Returns ``(start, end)`` inclusive, ``None`` when the header should be
+    ignored (absent, malformed or multi-range), or ``False`` when the range
+    cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or (last and int(last) < start):
+            return False
+    else:
+        length = int(last)
+        if not length:
+            return False
+        start, end = max(size - length, 0), size - 1
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, content_type, max_age, encoding=None, stat=None, immutable=False):
+    """
+    Serve ``path`` with caching validators, 304s and single-range support.
+
+    ``encoding`` is the Content-Encoding of the file on disk (for
+    precompressed variants); ranges are only honoured for identity files.
+    """
+    stat = stat or os.stat(path)
+    etag = _etag(stat, f'-{encoding}' if encoding else '')
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        response = not_modified
+    else:
+        byte_range = None
+        if encoding is None and request.method == 'GET':
+            if_range = request.META.get('HTTP_IF_RANGE')
+            # If-Range: only send the range if the client's copy is still current.
+            if not if_range or if_range in (etag, http_date(stat.st_mtime)) or (
+                parse_http_date_safe(if_range) or 0
+            ) >= int(stat.st_mtime):
+                byte_range = parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(path, start, end - start + 1), status=206, content_type=content_type
+            )
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response.headers['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+            response.headers['Content-Length'] = str(stat.st_size)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        response.headers['ETag'] = etag
+    if encoding is None:
+        response.headers['Accept-Ranges'] = 'bytes'
+    cache_control = f'public, max-age={max_age}'
+    response.headers['Cache-Control'] = cache_control + (', immutable' if immutable else '')
+    return response
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type in ('application/javascript', 'image/svg+xml'):
+            self.content_type += '; charset=utf-8'
+        self.variants = {
+            encoding: path + suffix for encoding, suffix in ENCODINGS if os.path.isfile(path + suffix)
+        }
+
+    def serve(self, request, max_age):
+        encoding = None
+        path = self.path
+        if self.variants:
+            accepted = accepted_encodings(request)
+            encoding = next((e for e, _ in ENCODINGS if e in self.variants and e in accepted), None)
+            if encoding:
+                path = self.variants[encoding]
+        response = file_response(
+            request, path, self.content_type,
+            IMMUTABLE_MAX_AGE if self.immutable else max_age,
+            encoding=encoding, immutable=self.immutable,
+        )
+        if self.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class StaticFileIndex:
+    """An in-memory map of ``STATIC_URL`` paths to collected files."""
+
+    def __init__(self, root, url):
+        self.url = url if url.startswith('/') else '/' + url
+        self.files = {}
+        if not root or not os.path.isdir(root):
+            return
+        hashed = set()
+        manifest = os.path.join(root, 'staticfiles.json')
+        if os.path.isfile(manifest):
+            with open(manifest) as fh:
+                hashed = set(json.load(fh).get('paths', {}).values())
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                self.files[self.url + name] = StaticFile(path, immutable=name in hashed)
+
+    def __len__(self):
+        return len(self.files)
+
+    def find(self, request_path):
+        return self.files.get(request_path)
+
+
+def serve_media(request, path):
+    """Serve an uploaded file from ``MEDIA_ROOT`` (used when DEBUG is off)."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    max_age = getattr(settings, 'MEDIA_CACHE_MAX_AGE', DEFAULT_MEDIA_MAX_AGE)
+    mode = getattr(settings, 'MEDIA_SERVE_MODE', 'django')
+    if mode == 'django':
+        return file_response(request, full_path, content_type, max_age, stat=stat)
+
+    # Let the front server stream the file (it handles ranges and validators).
+    response = HttpResponse(content_type=content_type)
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(path)
+    elif mode == 'x-sendfile':
+        response.headers['X-Sendfile'] = full_path
+    else:
+        raise ValueError(f'Unknown MEDIA_SERVE_MODE {mode!r}')
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response
@@ -0,0 +1,78 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .cart import merge_carts, refresh_summaries
+from .images import delete_variants, variants_stale
+from .models import Cart, Category, Product
+from .tasks import generate_image_variants, index_products, remove_from_index
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    """Keep the search index in sync when a product is saved."""
+    if raw:
+        return
+    index_products.delay([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    """Drop deleted products from the search index."""
+    remove_from_index.delay([instance.pk])
+
+
+@receiver(post_save, sender=Product)
+def refresh_carts_for_product(sender, instance, raw=False, **kwargs):
+    """Re-price the summaries of carts holding a product that was saved."""
+    if raw:
+        return
+    refresh_summaries(Cart.objects.filter(items__product=instance))
+
+
+@receiver(pre_delete, sender=Product)
+def remember_carts_for_product(sender, instance, **kwargs):
+    # The cart lines are gone by post_delete, so note the carts now.
+    instance._cart_ids = list(
+        Cart.objects.filter(items__product=instance).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Product)
+def refresh_carts_after_delete(sender, instance, **kwargs):
+    cart_ids = getattr(instance, '_cart_ids', None)
+    if cart_ids:
+        refresh_summaries(Cart.objects.filter(pk__in=cart_ids))
+
+
+@receiver(post_save, sender=Product)
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    """Regenerate responsive image derivatives when a product's image changes."""
+    if raw or not variants_stale(instance):
+        return
+    # The task bumps the catalog version itself once the variants are written.
+    generate_image_variants.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def delete_image_variants(sender, instance, **kwargs):
+    delete_variants(instance.image_variants)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Orphan every cached catalog entry when products or categories change."""
+    bump_catalog_version()
+
+
+@receiver(user_logged_in)
+def merge_session_cart(sender, request, user, **kwargs):
+    """Carry the anonymous session cart over to the user who just logged in."""
+    session = getattr(request, 'session', None)
+    session_cart_id = session.pop('cart_id', None) if session is not None else None
+    if session_cart_id:
+        merge_carts(session_cart_id, user)
@@ -0,0 +1,76 @@
+"""
+Static files storage for production.
+
+``CompressedManifestStaticFilesStorage`` extends Django's
+``ManifestStaticFilesStorage`` (content-hashed file names such as
+``css/base.3f2a9c.css``, safe to cache forever) with two build steps run by
+``collectstatic``:
+
+* the project's own CSS and JavaScript (files from ``STATICFILES_DIRS``) are
+  minified before hashing, so the hash covers the bytes actually served;
+* every hashed text asset gets precompressed ``.gz`` and, when the optional
+  ``brotli`` package is installed, ``.br`` siblings that a web server or
+  static handler can serve directly without compressing per request.
+"""
+import gzip
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .minify import minify_css, minify_js
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map', '.ico', '.ttf', '.eot', '.otf')
+# Below this size compression overhead outweighs the savings.
+MIN_COMPRESS_SIZE = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        paths = dict(paths)
+        project_dirs = {os.path.abspath(d[1] if isinstance(d, (list, tuple)) else d) for d in settings.STATICFILES_DIRS}
+        for name, (storage, path) in list(paths.items()):
+            minify = MINIFIERS.get(os.path.splitext(name)[1])
+            if minify is None or '.min.' in name or os.path.abspath(getattr(storage, 'location', '')) not in project_dirs:
+                continue
+            with storage.open(path) as fh:
+                content = minify(fh.read().decode('utf-8'))
+            self.delete(name)
+            self._save(name, ContentFile(content.encode('utf-8')))
+            # Hash (and copy) the minified file collected here, not the source.
+            paths[name] = (self, name)
+
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as fh:
+            content = fh.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            # Keep only variants that actually save bytes.
+            if len(compressed) < len(content):
+                self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,70 @@
+"""
+Background tasks for the store (run by ``python manage.py run_tasks``).
+
+Anything slow that a customer does not need to wait for -- sending email,
+re-encoding images, updating the search index -- is queued from the request
+with ``.delay()`` and done here.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, send_mail
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+
+from tasks.queue import task
+
+from .cache import bump_catalog_version
+from .images import update_variants
+from .models import Order, OrderItem, Product
+from .search import get_backend
+
+
+@task(max_attempts=5)
+def send_order_confirmation(order_id):
+    """Email the customer a summary of their order."""
+    order = Order.objects.with_totals().prefetch_related(
+        Prefetch('items', OrderItem.objects.select_related('product'))
+    ).get(pk=order_id)
+    send_mail(
+        f'Your order #{order.pk} has been received',
+        render_to_string('store/emails/order_confirmation.txt', {'order': order}),
+        settings.DEFAULT_FROM_EMAIL,
+        [order.email],
+    )
+
+
+@task(max_attempts=5)
+def send_contact_message(name, email, subject, message):
+    """Forward a contact form submission to the shop's inbox."""
+    EmailMessage(
+        f'[Contact] {subject}',
+        render_to_string('store/emails/contact_message.txt', {
+            'name': name, 'email': email, 'subject': subject, 'message': message,
+        }),
+        settings.DEFAULT_FROM_EMAIL,
+        [settings.CONTACT_EMAIL],
+        reply_to=[email] if email else None,
+    ).send()
+
+
+@task(cpu_bound=True)
+def generate_image_variants(product_id):
+    """Build the responsive derivatives of a product's image (see store.images)."""
+    product = Product.objects.filter(pk=product_id).only('pk', 'image', 'image_variants').first()
+    if product is not None and update_variants(product):
+        bump_catalog_version()
+
+
+@task
+def index_products(product_ids):
+    """(Re)index products in the search backend."""
+    get_backend().index(Product.objects.filter(pk__in=product_ids).only('pk', 'name', 'description'))
+    # The save signal bumped the catalog version before the index changed;
+    # bump it again so searches cached in between are not served stale.
+    bump_catalog_version()
+
+
+@task
+def remove_from_index(product_ids):
+    """Drop deleted products from the search backend."""
+    get_backend().remove(product_ids)
+    bump_catalog_version()
@@ -0,0 +1,29 @@
+"""
+Django template backend that reports render time to ``store.metrics``.
+
+Set as the ``BACKEND`` in ``settings.TEMPLATES``; it behaves exactly like
+``DjangoTemplates``. Render time includes queries run lazily from templates
+(they are also counted as database time).
+"""
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import metrics
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.record_template(time.perf_counter() - start)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
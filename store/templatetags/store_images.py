@@ -0,0 +1,50 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..images import MIME_TYPES, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_picture(product, sizes='100vw', css_class='', loading='lazy', **attrs):
+    """
+    Render a product image as a ``<picture>`` with AVIF/WebP ``srcset``
+    sources and a fallback ``<img>``.
+
+        {% load store_images %}
+        {% product_picture product sizes="(max-width: 768px) 100vw, 33vw" css_class="card-img-top" %}
+
+    Products without generated variants fall back to the original image.
+    Extra keyword arguments become attributes of the ``<img>`` (underscores
+    turn into hyphens, so ``data_full=...`` renders ``data-full="..."``).
+    """
+    variants = product.image_variants or {}
+    formats = variants.get('formats', {})
+    fallback = next((ext for ext in ('jpg', 'png') if ext in formats), None)
+    img_attrs = {'class': css_class, 'alt': product.name, 'loading': loading, 'decoding': 'async'}
+    img_attrs.update((name.replace('_', '-'), value) for name, value in attrs.items())
+
+    if variants.get('source') != product.image.name or fallback is None:
+        return format_html(
+            '<img src="{}"{}>', product.image.url, format_html_join('', ' {}="{}"', img_attrs.items())
+        )
+
+    largest = max(formats[fallback], key=int)
+    img_attrs.update({
+        'srcset': srcset(variants, fallback),
+        'sizes': sizes,
+        # Intrinsic size lets the browser reserve space before the image loads.
+        'width': variants['width'],
+        'height': variants['height'],
+    })
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[ext], srcset(variants, ext), sizes) for ext in ('avif', 'webp') if ext in formats),
+    )
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        sources,
+        product.image.storage.url(formats[fallback][largest]),
+        format_html_join('', ' {}="{}"', ((k, v) for k, v in img_attrs.items() if v != '')),
+    )
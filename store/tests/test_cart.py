@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from store.cart import add_item, merge_carts
+from store.models import Cart, CartItem, Category, Order, Product, StockReservation
+from store.queries import assert_max_queries
+from store.tests.test_checkout import SHIPPING
+
+
+# Outside a test transaction, so the views' query budgets see production counts.
+class RequestCartTests(TransactionTestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Books', slug='books')
+        self.book = Product.objects.create(category=category, name='Book', slug='book', price='10.00', stock=5)
+
+    def test_reading_the_cart_creates_no_rows(self):
+        for name in ('store:cart_detail', 'store:api_cart_status'):
+            with self.subTest(view=name):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_views_share_the_saved_cart(self):
+        self.client.post(reverse('store:cart_add', args=[self.book.pk]), {'quantity': 2})
+        cart = Cart.objects.get()
+        response = self.client.get(reverse('store:cart_detail'))
+        self.assertEqual(response.context['cart'].pk, cart.pk)
+        self.assertEqual([item.quantity for item in response.context['cart'].items.all()], [2])
+        response = self.client.get(reverse('store:api_cart_status'), {'summary': '1'})
+        self.assertEqual(response.json()['cart_count'], 2)
+
+    def test_checkout_orders_the_request_cart(self):
+        user = User.objects.create_user('ada', password='secret')
+        self.client.force_login(user)
+        self.client.post(reverse('store:cart_add', args=[self.book.pk]))
+        response = self.client.post(reverse('store:checkout'), SHIPPING)
+        self.assertRedirects(response, reverse('store:order_confirmation'), fetch_redirect_response=False)
+        order = Order.objects.get(user=user)
+        self.assertEqual(list(order.items.values_list('product_id', 'quantity')), [(self.book.pk, 1)])
+        self.assertEqual(Cart.objects.get(user=user).item_count, 0)
+
+
+class MergeCartTests(TransactionTestCase):
+    """Merging the session cart on login, outside a test transaction so query counts match production."""
+
+    def setUp(self):
+        category = Category.objects.create(name='Books', slug='books')
+        # Book and ink track stock; pen and pad do not.
+        self.book, self.pen, self.ink, self.pad = [
+            Product.objects.create(category=category, name=name, slug=name.lower(), price='2.00', stock=stock)
+            for name, stock in (('Book', 10), ('Pen', None), ('Ink', 10), ('Pad', None))
+        ]
+        self.user = User.objects.create_user('ada', password='secret')
+        self.anonymous = Cart.objects.create()
+
+    def lines(self, cart):
+        return dict(CartItem.objects.filter(cart=cart).values_list('product__slug', 'quantity'))
+
+    def holds(self, cart):
+        return dict(StockReservation.objects.filter(cart=cart).values_list('product__slug', 'quantity'))
+
+    def test_merges_into_the_users_cart(self):
+        target = Cart.objects.create(user=self.user)
+        add_item(target, self.book, 1)
+        add_item(target, self.pen, 1)
+        for product, quantity in ((self.book, 2), (self.ink, 3), (self.pad, 1)):
+            add_item(self.anonymous, product, quantity)
+
+        # Constant whatever the size of either cart.
+        with assert_max_queries(13):
+            merge_carts(self.anonymous.pk, self.user)
+
+        self.assertFalse(Cart.objects.filter(pk=self.anonymous.pk).exists())
+        self.assertEqual(self.lines(target), {'book': 3, 'pen': 1, 'ink': 3, 'pad': 1})
+        # Only tracked products hold stock; the holds move and add up too.
+        self.assertEqual(self.holds(target), {'book': 3, 'ink': 3})
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.reserved, 3)
+        target.refresh_from_db()
+        self.assertEqual((target.item_count, str(target.subtotal)), (8, '16.00'))
+
+    def test_adopts_the_cart_when_the_user_has_none(self):
+        add_item(self.anonymous, self.book, 2)
+        with assert_max_queries(4):
+            merge_carts(self.anonymous.pk, self.user)
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(cart.pk, self.anonymous.pk)
+        self.assertEqual(self.lines(cart), {'book': 2})
+        self.assertEqual(self.holds(cart), {'book': 2})
+
+    def test_ignores_carts_that_belong_to_a_user(self):
+        other = Cart.objects.create(user=User.objects.create_user('bob'))
+        add_item(other, self.book, 1)
+        merge_carts(other.pk, self.user)
+        self.assertEqual(self.lines(other), {'book': 1})
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+    def test_login_merges_the_session_cart(self):
+        target = Cart.objects.create(user=self.user)
+        add_item(target, self.book, 1)
+        self.client.post(reverse('store:cart_add', args=[self.book.pk]), {'quantity': 2})
+        session_cart = Cart.objects.get(user=None, items__isnull=False)
+        self.client.login(username='ada', password='secret')
+        self.assertFalse(Cart.objects.filter(pk=session_cart.pk).exists())
+        self.assertEqual(self.lines(target), {'book': 3})
+        self.assertNotIn('cart_id', self.client.session)
+
+
+class PurgeCartsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Books', slug='books')
+        cls.book = Product.objects.create(category=category, name='Book', slug='book', price='10.00', stock=5)
+
+    def cart(self, days_old, user=None):
+        cart = Cart.objects.create(user=user)
+        add_item(cart, self.book)
+        Cart.objects.filter(pk=cart.pk).update(updated=timezone.now() - timedelta(days=days_old))
+        return cart
+
+    def test_deletes_abandoned_anonymous_carts_and_releases_their_stock(self):
+        stale, recent = self.cart(40), self.cart(1)
+        user_cart = self.cart(40, User.objects.create_user('ada'))
+        call_command('purge_carts', stdout=StringIO())
+        self.assertEqual(set(Cart.objects.values_list('pk', flat=True)), {recent.pk, user_cart.pk})
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.reserved, 2)
+        self.assertFalse(StockReservation.objects.filter(cart=stale.pk).exists())
+
+    def test_keeps_carts_used_after_they_were_selected(self):
+        cart = self.cart(40)
+        atomic = transaction.atomic
+
+        @contextmanager
+        def use_cart_then_atomic(*args, **kwargs):
+            # The shopper comes back between the batch query and the delete.
+            Cart.objects.filter(pk=cart.pk).update(updated=timezone.now())
+            with atomic(*args, **kwargs):
+                yield
+
+        with mock.patch.object(transaction, 'atomic', use_cart_then_atomic):
+            call_command('purge_carts', stdout=StringIO())
+        self.assertTrue(Cart.objects.filter(pk=cart.pk).exists())
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.reserved, 1)
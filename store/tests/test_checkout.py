@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from store.cart import add_item
+from store.checkout import place_order
+from store.models import Cart, CartItem, Category, Product
+
+SHIPPING = {
+    'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com',
+    'address': '1 Main St', 'postal_code': '12345', 'city': 'London',
+}
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Books', slug='books')
+        cls.book = Product.objects.create(category=category, name='Book', slug='book', price='10.00', stock=5)
+        cls.pen = Product.objects.create(category=category, name='Pen', slug='pen', price='2.00')
+        cls.user = User.objects.create_user('ada', password='secret')
+
+    def setUp(self):
+        self.cart = Cart.objects.create(user=self.user)
+        add_item(self.cart, self.book, 2)
+
+    def test_orders_lines_and_empties_cart(self):
+        order = place_order(self.cart, self.user, SHIPPING)
+        self.assertEqual(list(order.items.values_list('product_id', 'quantity')), [(self.book.pk, 2)])
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.stock, self.book.reserved), (3, 0))
+
+    def test_line_added_during_checkout_stays_in_cart(self):
+        select_for_update = Product.objects.select_for_update
+
+        def add_pen_then_lock(*args, **kwargs):
+            # Another request adds a product after the lines were first read.
+            CartItem.objects.create(cart=self.cart, product=self.pen, quantity=1)
+            return select_for_update(*args, **kwargs)
+
+        with mock.patch.object(Product.objects, 'select_for_update', side_effect=add_pen_then_lock):
+            order = place_order(self.cart, self.user, SHIPPING)
+
+        self.assertEqual(list(order.items.values_list('product_id', flat=True)), [self.book.pk])
+        self.assertEqual(list(CartItem.objects.filter(cart=self.cart).values_list('product_id', flat=True)), [self.pen.pk])
+        self.cart.refresh_from_db()
+        self.assertEqual(self.cart.item_count, 1)
@@ -0,0 +1,15 @@
+from django.test import SimpleTestCase, override_settings
+
+from store.checks import check_catalog_cache
+
+
+class CatalogCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_warns(self):
+        self.assertEqual([warning.id for warning in check_catalog_cache(None)], ['store.W001'])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379/1',
+    }})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_catalog_cache(None), [])
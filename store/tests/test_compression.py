@@ -0,0 +1,33 @@
+import gzip
+import json
+from unittest import skipUnless
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from store.middleware import BROTLI_FLUSH_BYTES, CompressionMiddleware, brotli
+
+ROWS = [json.dumps({'id': i, 'name': f'Product {i}', 'price': i * 1.5}).encode() + b'\n' for i in range(5000)]
+
+
+class CompressionTests(SimpleTestCase):
+    def compress(self, response, encoding):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def stream(self):
+        return StreamingHttpResponse(iter(ROWS), content_type='application/x-ndjson')
+
+    def test_gzip(self):
+        response = self.compress(HttpResponse(b''.join(ROWS), content_type='text/plain'), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), b''.join(ROWS))
+
+    @skipUnless(brotli, 'brotli is not installed')
+    def test_brotli_stream_flushes_in_blocks(self):
+        response = self.compress(self.stream(), 'br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        chunks = list(response.streaming_content)
+        self.assertEqual(brotli.decompress(b''.join(chunks)), b''.join(ROWS))
+        # One flush per BROTLI_FLUSH_BYTES of input, not one per row.
+        self.assertLessEqual(len(chunks), len(b''.join(ROWS)) // BROTLI_FLUSH_BYTES + 2)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from store.cache import get_cache
+from store.cart import add_item
+from store.models import Cart, Category, Product
+
+# Far enough ahead that no row can have been updated since.
+FUTURE = http_date(4102444800)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Books', slug='books')
+        cls.book = Product.objects.create(category=category, name='Book', slug='book', price='10.00', stock=5)
+        cls.urls = (
+            reverse('store:product_list'),
+            cls.book.get_absolute_url(),
+            reverse('store:api_products') + '?in_stock=1',
+        )
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_etag_only(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_alone_never_answers_304(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=FUTURE).status_code, 200)
+
+    def test_reservations_change_the_etag(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        add_item(Cart.objects.create(), self.book, 5)
+        # Stock-dependent facet counts are cached for STORE_STOCK_CACHE_TIMEOUT.
+        get_cache().clear()
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
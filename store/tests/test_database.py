@@ -0,0 +1,20 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from ecommerce_project.database import sqlite_pragmas
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite backend only')
+class SQLitePragmaTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_connections_are_tuned(self):
+        connection.ensure_connection()
+        # PRAGMA reads return the numeric codes of the named settings.
+        expected = {**sqlite_pragmas(), 'synchronous': 1, 'temp_store': 2}
+        for name in ('busy_timeout', 'synchronous', 'cache_size', 'temp_store'):
+            with self.subTest(pragma=name):
+                value = connection.connection.execute(f'PRAGMA {name}').fetchone()[0]
+                self.assertEqual(value, expected[name])
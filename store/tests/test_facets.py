@@ -0,0 +1,41 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from store.cache import get_cache
+from store.models import Category, Product
+
+
+class UnknownCategoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.books = Category.objects.create(name='Books', slug='books')
+        cls.games = Category.objects.create(name='Games', slug='games')
+        Product.objects.create(category=cls.books, name='Novel', slug='novel', price='10.00')
+        Product.objects.create(category=cls.games, name='Chess', slug='chess', price='20.00')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_product_list_ignores_unknown_category(self):
+        response = self.client.get(reverse('store:product_list'), {'category': ['books', 'nope']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([product.slug for product in response.context['products']], ['novel'])
+
+    def test_product_list_with_only_unknown_categories_lists_everything(self):
+        response = self.client.get(reverse('store:product_list'), {'category': 'nope'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['products']), 2)
+        self.assertFalse(response.context['has_filters'])
+
+    def test_api_products_ignores_unknown_category(self):
+        response = self.client.get(reverse('store:api_products'), {'category': ['games', 'nope'], 'facets': '1'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([product['slug'] for product in data['products']], ['chess'])
+        self.assertEqual(
+            [category['slug'] for category in data['facets']['categories'] if category['selected']], ['games']
+        )
+
+    def test_unknown_category_page_is_404(self):
+        response = self.client.get(reverse('store:product_list_by_category', args=['nope']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from store.feeds import RowError, clean_row
+
+
+class CleanRowPriceTests(SimpleTestCase):
+    def row(self, price):
+        return {'name': 'Widget', 'category': 'Tools', 'price': price}
+
+    def test_valid_price_is_quantized(self):
+        self.assertEqual(clean_row(self.row('9.999'))['price'], Decimal('10.00'))
+
+    def test_non_finite_prices_are_rejected(self):
+        for price in ('NaN', 'nan', 'sNaN', 'Infinity', '-Infinity', 'inf'):
+            with self.subTest(price=price), self.assertRaisesMessage(RowError, 'invalid price'):
+                clean_row(self.row(price))
+
+    def test_non_finite_prices_in_ndjson_are_rejected(self):
+        for line in ('{"name": "Widget", "category": "Tools", "price": NaN}',
+                     '{"name": "Widget", "category": "Tools", "price": Infinity}'):
+            with self.subTest(line=line), self.assertRaisesMessage(RowError, 'invalid price'):
+                clean_row(line)
+
+    def test_negative_price_is_out_of_range(self):
+        with self.assertRaisesMessage(RowError, 'out of range'):
+            clean_row(self.row('-1'))
+
+    def test_unparseable_price_is_rejected(self):
+        with self.assertRaisesMessage(RowError, 'invalid price'):
+            clean_row(self.row('ten'))
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+
+from store.cart import add_item, remove_item
+from store.inventory import OutOfStock, release_expired_reservations
+from store.models import Cart, Category, Product, StockReservation
+
+
+class ReservationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Books', slug='books')
+        cls.product = Product.objects.create(category=category, name='Book', slug='book', price='10.00', stock=5)
+
+    def setUp(self):
+        self.cart = Cart.objects.create()
+
+    def assertHeld(self, reserved, held):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved, reserved)
+        self.assertEqual(
+            list(StockReservation.objects.filter(cart=self.cart).values_list('quantity', flat=True)), held
+        )
+
+    def test_add_and_remove_keep_reservations_in_step(self):
+        add_item(self.cart, self.product, 3)
+        add_item(self.cart, self.product, 1)
+        self.assertHeld(4, [4])
+        remove_item(self.cart, self.product, 3)
+        self.assertHeld(1, [1])
+        remove_item(self.cart, self.product, 1)
+        self.assertHeld(0, [])
+
+    def test_adding_refreshes_every_hold_in_the_cart(self):
+        other = Product.objects.create(category=self.product.category, name='Pen', slug='pen', price='2.00', stock=5)
+        add_item(self.cart, other)
+        StockReservation.objects.update(expires_at=self.cart.created)
+        add_item(self.cart, self.product)
+        self.assertFalse(StockReservation.objects.filter(expires_at=self.cart.created).exists())
+
+    def test_out_of_stock_leaves_the_outer_transaction_usable(self):
+        add_item(self.cart, self.product, 5)
+        with transaction.atomic():
+            with self.assertRaises(OutOfStock):
+                add_item(self.cart, self.product)
+            self.assertEqual(Cart.objects.filter(pk=self.cart.pk).count(), 1)
+        self.assertHeld(5, [5])
+
+    def expire_holds(self):
+        StockReservation.objects.update(expires_at=self.cart.created - timedelta(minutes=1))
+        return release_expired_reservations()
+
+    def test_remove_after_the_sweep_returns_stock_once(self):
+        add_item(self.cart, self.product, 2)
+        self.assertEqual(self.expire_holds(), 1)
+        self.assertHeld(0, [])
+        remove_item(self.cart, self.product, 2)
+        self.assertHeld(0, [])
+
+    def test_add_after_the_sweep_holds_again(self):
+        add_item(self.cart, self.product, 2)
+        self.expire_holds()
+        add_item(self.cart, self.product)
+        self.assertHeld(1, [1])
+
+    def test_holds_are_locked_before_stock_changes(self):
+        # The expiry sweep locks the holds it releases; reserving and
+        # releasing must take the same locks so a hold is returned only once.
+        manager = StockReservation.objects
+        for action in (lambda: add_item(self.cart, self.product), lambda: remove_item(self.cart, self.product)):
+            with mock.patch.object(manager, 'select_for_update', wraps=manager.select_for_update) as select_for_update:
+                action()
+            select_for_update.assert_called_once_with()
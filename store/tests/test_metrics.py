@@ -0,0 +1,14 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class ServerTimingTests(TestCase):
+    @override_settings(METRICS={})
+    def test_off_by_default(self):
+        response = self.client.get(reverse('store:about'))
+        self.assertNotIn('Server-Timing', response.headers)
+
+    @override_settings(METRICS={'SERVER_TIMING': True})
+    def test_opt_in(self):
+        response = self.client.get(reverse('store:about'))
+        self.assertIn('db;', response.headers['Server-Timing'])
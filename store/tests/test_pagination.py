@@ -0,0 +1,83 @@
+import base64
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from store.cache import get_cache
+from store.models import Category, Product
+from store.pagination import InvalidCursor, KeysetPaginator
+
+
+def make_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+# Each payload is valid JSON but not a cursor this ordering can use.
+TAMPERED_CURSORS = {
+    'ordering not a list': {'o': 5, 'd': 'n', 'v': ['a', 1]},
+    'ordering of non-strings': {'o': [1, 2], 'd': 'n', 'v': ['a', 1]},
+    'values not a list': {'o': ['name', 'id'], 'd': 'n', 'v': 5},
+    'missing values': {'o': ['name', 'id'], 'd': 'n'},
+    'too few values': {'o': ['name', 'id'], 'd': 'n', 'v': ['a']},
+    'null value': {'o': ['name', 'id'], 'd': 'n', 'v': [None, 1]},
+    'nested value': {'o': ['name', 'id'], 'd': 'n', 'v': ['a', [1]]},
+    'non-numeric id': {'o': ['name', 'id'], 'd': 'n', 'v': ['a', 'abc']},
+    'id out of range': {'o': ['name', 'id'], 'd': 'n', 'v': ['a', 10 ** 30]},
+    'unknown direction': {'o': ['name', 'id'], 'd': 'x', 'v': ['a', 1]},
+    'not an object': [1, 2],
+}
+
+
+class CursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Books', slug='books')
+        for i in range(5):
+            Product.objects.create(category=category, name=f'Book {i}', slug=f'book-{i}', price='10.00')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def paginator(self, ordering=('name', 'id')):
+        return KeysetPaginator(Product.objects.all(), ordering, page_size=2)
+
+    def test_round_trip(self):
+        page = self.paginator().get_page()
+        next_page = self.paginator().get_page(page.next_cursor)
+        self.assertEqual([p.slug for p in next_page], ['book-2', 'book-3'])
+
+    def test_tampered_cursors_are_invalid(self):
+        for case, payload in TAMPERED_CURSORS.items():
+            with self.subTest(case), self.assertRaises(InvalidCursor):
+                self.paginator().get_page(make_cursor(payload))
+
+    def test_non_numeric_rank_is_invalid(self):
+        for rank in ('abc', 'nan', 'inf'):
+            cursor = make_cursor({'o': ['-search_rank', 'id'], 'd': 'n', 'v': [rank, 1]})
+            with self.subTest(rank=rank), self.assertRaises(InvalidCursor):
+                self.paginator(('-search_rank', 'id')).decode_cursor(cursor)
+
+    def test_garbage_is_invalid(self):
+        for cursor in ('!!!', 'e30', make_cursor('text')):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                self.paginator().get_page(cursor)
+
+    def test_product_list_falls_back_to_first_page(self):
+        for case, payload in TAMPERED_CURSORS.items():
+            with self.subTest(case):
+                response = self.client.get(reverse('store:product_list'), {'cursor': make_cursor(payload)})
+                self.assertEqual(response.status_code, 200)
+
+    def test_search_listing_rejects_bad_rank(self):
+        cursor = make_cursor({'o': ['-search_rank', 'id'], 'd': 'n', 'v': ['abc', 1]})
+        response = self.client.get(
+            reverse('store:product_list'), {'search': 'book', 'sort': 'relevance', 'cursor': cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_products_rejects_tampered_cursors(self):
+        for case, payload in TAMPERED_CURSORS.items():
+            with self.subTest(case):
+                response = self.client.get(reverse('store:api_products'), {'cursor': make_cursor(payload)})
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,121 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from store.cache import get_cache
+from store.cart import add_item
+from store.models import Cart, Category, Product
+from store.queries import assert_max_queries
+
+
+def create_catalog():
+    categories = [Category.objects.create(name=f'Category {i}', slug=f'category-{i}') for i in range(3)]
+    products = [
+        Product.objects.create(
+            category=categories[i % 3], name=f'Widget {i:02}', slug=f'widget-{i:02}',
+            price=f'{5 + i}.00', stock=100 if i % 2 else None,
+        )
+        for i in range(30)
+    ]
+    user = User.objects.create_user('shopper', password='secret')
+    cart = Cart.objects.create(user=user)
+    for product in products[:5]:
+        add_item(cart, product, 2)
+    return categories, products, user
+
+
+class QueryCountMixin:
+    def setUp(self):
+        # Cold cache: every test sees the counts of the first visitor.
+        get_cache().clear()
+
+    def assertQueries(self, max_queries, method, url, data=None, **extra):
+        with assert_max_queries(max_queries):
+            response = getattr(self.client, method)(url, data or {}, **extra)
+        self.assertLess(response.status_code, 400)
+        return response
+
+
+# Overrunning a view's @query_budget fails the test as well.
+@override_settings(QUERY_BUDGET={'DEFAULT': 20, 'RAISE': True})
+class CatalogQueryCountTests(QueryCountMixin, TestCase):
+    """Query counts of the read-only views; none may grow with the catalog or cart size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories, products, cls.user = create_catalog()
+        cls.category = categories[0]
+        cls.product = products[1]
+
+    def test_product_list(self):
+        self.assertQueries(5, 'get', reverse('store:product_list'))
+
+    def test_product_list_next_page(self):
+        response = self.client.get(reverse('store:product_list'))
+        get_cache().clear()
+        self.assertQueries(5, 'get', reverse('store:product_list'), {'cursor': response.context['page'].next_cursor})
+
+    def test_product_list_search(self):
+        self.assertQueries(5, 'get', reverse('store:product_list'), {'search': 'widget', 'sort': 'relevance'})
+
+    def test_product_list_facets(self):
+        self.assertQueries(5, 'get', self.category.get_absolute_url(), {'price': '0-25', 'in_stock': '1'})
+
+    def test_product_list_logged_in(self):
+        self.client.force_login(self.user)
+        self.assertQueries(7, 'get', reverse('store:product_list'))
+
+    def test_product_detail(self):
+        self.assertQueries(5, 'get', self.product.get_absolute_url())
+
+    def test_cart_detail(self):
+        self.client.force_login(self.user)
+        self.assertQueries(4, 'get', reverse('store:cart_detail'))
+
+    def test_api_products(self):
+        self.assertQueries(4, 'get', reverse('store:api_products'))
+
+    def test_api_products_with_total_and_facets(self):
+        self.assertQueries(6, 'get', reverse('store:api_products'), {'total': '1', 'facets': '1', 'in_stock': '1'})
+
+
+@override_settings(QUERY_BUDGET={'DEFAULT': 20, 'RAISE': True})
+class CartQueryCountTests(QueryCountMixin, TransactionTestCase):
+    """Query counts of the cart mutations, outside a test transaction so they match production."""
+
+    def setUp(self):
+        super().setUp()
+        _, self.products, self.user = create_catalog()
+        self.tracked, self.untracked = self.products[1], self.products[0]
+        self.client.force_login(self.user)
+
+    def add(self, max_queries, product):
+        return self.assertQueries(max_queries, 'post', reverse('store:cart_add', args=[product.pk]),
+                                  HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_cart_add(self):
+        for product in (self.tracked, self.untracked):
+            with self.subTest(product=product.name):
+                self.add(12, product)
+
+    def test_cart_add_new_hold(self):
+        # A tracked product not in the cart yet also inserts its reservation.
+        self.add(13, self.products[11])
+
+    def test_first_cart_add_by_user(self):
+        Cart.objects.filter(user=self.user).delete()
+        # The view's budget: lookups, BEGIN + cart INSERT, then the add itself.
+        self.add(15, self.products[11])
+
+    def test_first_cart_add_by_anonymous_visitor(self):
+        self.client.logout()
+        # 11 in the view (cart INSERT, then the add); saving the new session
+        # takes 3 more after the view has returned.
+        self.add(14, self.products[11])
+
+    def test_cart_remove(self):
+        for product in (self.tracked, self.untracked):
+            for remaining in ('one', 'last'):
+                with self.subTest(product=product.name, remaining=remaining):
+                    self.assertQueries(12, 'post', reverse('store:cart_remove', args=[product.pk]),
+                                       HTTP_X_REQUESTED_WITH='XMLHttpRequest')
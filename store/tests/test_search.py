@@ -0,0 +1,94 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ecommerce_project.routers import begin_request, end_request
+from store import search
+from store.cache import get_cache
+from store.models import Category, Product
+from store.search import DatabaseSearchBackend, SQLiteFTS5Backend
+
+# Queries made only of punctuation have no searchable terms.
+QUERIES_WITHOUT_TERMS = ('!', '"', '-', '...')
+
+
+class EmptySearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Books', slug='books')
+        Product.objects.create(category=category, name='Python Book', slug='python-book', price='10.00')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_product_list_returns_no_results(self):
+        for query in QUERIES_WITHOUT_TERMS:
+            with self.subTest(query=query):
+                response = self.client.get(reverse('store:product_list'), {'search': query})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['products']), [])
+
+    def test_backends_rank_empty_results(self):
+        for backend in (DatabaseSearchBackend(), SQLiteFTS5Backend()):
+            for query in QUERIES_WITHOUT_TERMS:
+                with self.subTest(backend=type(backend).__name__, query=query):
+                    results = backend.search(Product.objects.all(), query).order_by('-search_rank')
+                    self.assertEqual(list(results), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'The FTS5 index only exists on SQLite.')
+class SearchIndexSchemaTests(TestCase):
+    def test_migrated_table_matches_backend(self):
+        # The migrations freeze the FTS5 DDL; this catches search.py drifting from them.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = %s", [SQLiteFTS5Backend.table])
+            (migrated,) = cursor.fetchone()
+        expected = SQLiteFTS5Backend.create_table_sql().replace(' IF NOT EXISTS', '')
+        self.assertEqual(migrated, expected)
+
+
+class BackendSelectionTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(setattr, search, '_backend', search._backend)
+        search._backend = None
+
+    def test_choosing_the_backend_does_not_mark_a_write(self):
+        state, token = begin_request()
+        try:
+            search.get_backend()
+        finally:
+            end_request(token)
+        self.assertFalse(state.wrote)
+
+
+@override_settings(TASKS={'EAGER': True})
+class SearchIndexSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Books', slug='books')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def search(self, query):
+        response = self.client.get(reverse('store:product_list'), {'search': query})
+        return [product.slug for product in response.context['products']]
+
+    def test_new_product_turns_up_in_cached_search(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(category=self.category, name='Atlas', slug='atlas', price='10.00')
+            # Cached after the save signal but before the index task has run.
+            self.assertEqual(self.search('atlas'), [])
+        self.assertEqual(self.search('atlas'), ['atlas'])
+
+    def test_renamed_product_is_found_by_its_new_name(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(category=self.category, name='Atlas', slug='atlas', price='10.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = 'Globe'
+            product.save()
+            self.assertEqual(self.search('globe'), [])
+        self.assertEqual(self.search('globe'), ['atlas'])
+        self.assertEqual(self.search('atlas'), [])
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under ASGI the JSON API and cart endpoints are served by async views.
+api_views = async_views if getattr(settings, 'ASYNC_VIEWS', False) else views
 
 app_name = 'store'
 
@@ -8,13 +12,14 @@ urlpatterns = [
     path('category/<slug:category_slug>/', views.product_list, name='product_list_by_category'),
     path('product/<slug:slug>/', views.product_detail, name='product_detail'),
     path('cart/', views.cart_detail, name='cart_detail'),
-    path('add/<int:product_id>/', views.cart_add, name='cart_add'),
-    path('remove/<int:product_id>/', views.cart_remove, name='cart_remove'),
+    path('add/<int:product_id>/', api_views.cart_add, name='cart_add'),
+    path('remove/<int:product_id>/', api_views.cart_remove, name='cart_remove'),
     path('checkout/', views.checkout, name='checkout'),
     path('order-confirmation/', views.order_confirmation, name='order_confirmation'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
     # API endpoints
-    path('api/products/', views.api_products, name='api_products'),
-    path('api/cart/', views.api_cart_status, name='api_cart_status'),
+    path('api/products/', api_views.api_products, name='api_products'),
+    path('api/products/export/', views.api_products_export, name='api_products_export'),
+    path('api/cart/', api_views.api_cart_status, name='api_cart_status'),
 ]
\ No newline at end of file
@@ -1,198 +1,242 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
-from .models import Category, Product, Cart, CartItem, Order, OrderItem
+from ecommerce_project.routers import read_replica
+from .models import Category, Product, CartItem
+from .cache import cache_timeout, cached_catalog
+from .cart import add_item, get_cart, remove_item
+from .checkout import CheckoutError, place_order
+from .conditional import (
+    api_products_validators, conditional, product_detail_validators, product_list_validators,
+)
+from .export import CONTENT_TYPES, export_rows, stream_export
+from .facets import FacetFilters, build_facets, category_list, facet_rows, price_buckets, stock_cache_timeout
 from .forms import CheckoutForm
+from .inventory import OutOfStock
+from .pagination import (
+    InvalidCursor, KeysetPaginator, cursor_querystring, estimate_count, get_page_size,
+)
+from .queries import query_budget
+from .search import search_products
+from .tasks import send_contact_message
 import json
 
+# Keyset orderings for each sort option; every ordering ends in a unique tiebreaker.
+SORT_ORDERINGS = {
+    'relevance': ('-search_rank', 'id'),
+    'price_low': ('price', 'id'),
+    'price_high': ('-price', '-id'),
+    'newest': ('-created', '-id'),
+    'name': ('name', 'id'),
+}
+
+@query_budget(10)
+@read_replica
+@conditional(product_list_validators)
 def product_list(request, category_slug=None):
-    """Display a list of available products, optionally filtered by category."""
-    category = None
-    categories = Category.objects.all()
-    products = Product.objects.filter(available=True)
+    """Display a list of available products, narrowed by category, price and stock facets."""
+    categories = category_list()
+    if category_slug and not any(c.slug == category_slug for c in categories):
+        raise Http404('No Category matches the given query.')
+    filters = FacetFilters.from_request(request, categories, category_slug)
+    category_ids = filters.category_ids(categories)
+    category = next((c for c in categories if c.pk in category_ids), None) if len(category_ids) == 1 else None
     
-    # Search functionality
-    search_query = request.GET.get('search', '')
-    if search_query:
-        products = products.filter(
-            name__icontains=search_query
-        ) | products.filter(
-            description__icontains=search_query
-        )
-    
-    if category_slug:
-        category = get_object_or_404(Category, slug=category_slug)
-        products = products.filter(category=category)
+    search_query = request.GET.get('search', '').strip()
     
     # Sorting
-    sort_by = request.GET.get('sort', 'name')
-    if sort_by == 'price_low':
-        products = products.order_by('price')
-    elif sort_by == 'price_high':
-        products = products.order_by('-price')
-    elif sort_by == 'newest':
-        products = products.order_by('-created')
-    else:
-        products = products.order_by('name')
+    sort_by = request.GET.get('sort', 'relevance' if search_query else 'name')
+    if sort_by not in SORT_ORDERINGS or (sort_by == 'relevance' and not search_query):
+        sort_by = 'name'
+    
+    # One grouped query counts every facet value and the matching total.
+    facets = build_facets(facet_rows(search_query, filters), categories, filters, category_ids)
+    _add_facet_urls(request, facets, filters)
+    
+    cursor = request.GET.get('cursor')
+    page_size = get_page_size(request)
+    page = cached_catalog(
+        'product_list',
+        (search_query, sort_by, cursor, page_size, *filters.cache_parts),
+        lambda: _product_listing(category_ids, filters, search_query, sort_by, cursor, page_size),
+        stock_cache_timeout() if filters.in_stock else None,
+    )
     
     return render(request, 'store/product_list.html', {
         'category': category,
-        'categories': categories,
-        'products': products,
+        'facets': facets,
+        'categories_selected': bool(category_ids),
+        'has_filters': bool(filters.categories or filters.prices or filters.in_stock),
+        'clear_filters_url': _facet_url(request, (), (), False),
+        'products': page,
+        'page': page,
+        'next_url': cursor_querystring(request, page.next_cursor) if page.has_next else None,
+        'previous_url': cursor_querystring(request, page.previous_cursor) if page.has_previous else None,
+        'total_count': facets['total'],
         'search_query': search_query,
-        'sort_by': sort_by
+        'sort_by': sort_by,
+        'cache_timeout': cache_timeout(),
     })
 
+def _product_listing(category_ids, filters, search_query, sort_by, cursor, page_size):
+    """Query one page of the product listing (cached by ``product_list``)."""
+    products = Product.objects.filter(available=True)
+    
+    # Search functionality
+    if search_query:
+        products = search_products(products, search_query)
+    
+    products = filters.apply(products, category_ids)
+    
+    paginator = KeysetPaginator(products, SORT_ORDERINGS[sort_by], page_size)
+    try:
+        return paginator.get_page(cursor)
+    except InvalidCursor:
+        return paginator.get_page()
+
+def _facet_url(request, categories, prices, in_stock):
+    """URL of the listing with the given facet selection, keeping search and sort."""
+    params = request.GET.copy()
+    for name in ('category', 'price', 'in_stock', 'cursor'):
+        params.pop(name, None)
+    if len(categories) == 1:
+        path = reverse('store:product_list_by_category', args=[next(iter(categories))])
+    else:
+        path = reverse('store:product_list')
+        params.setlist('category', sorted(categories))
+    params.setlist('price', [bucket.key for bucket in price_buckets() if bucket.key in prices])
+    if in_stock:
+        params['in_stock'] = '1'
+    query = params.urlencode()
+    return f'{path}?{query}' if query else path
+
+def _add_facet_urls(request, facets, filters):
+    """Give every facet value the URL that toggles it."""
+    categories, prices = set(filters.categories), set(filters.prices)
+    facets['all_categories_url'] = _facet_url(request, (), prices, filters.in_stock)
+    for value in facets['categories']:
+        value['url'] = _facet_url(request, categories ^ {value['slug']}, prices, filters.in_stock)
+    for value in facets['price']:
+        value['url'] = _facet_url(request, categories, prices ^ {value['key']}, filters.in_stock)
+    for value in facets['availability']:
+        value['url'] = _facet_url(request, categories, prices, not filters.in_stock)
+
+@query_budget(8)
+@read_replica
+@conditional(product_detail_validators)
 def product_detail(request, slug):
     """Display detailed information about a specific product."""
-    product = get_object_or_404(Product, slug=slug, available=True)
+    # Not cached: the stock badge must reflect live reservations.
+    product = get_object_or_404(Product.objects.select_related('category'), slug=slug, available=True)
     
     # Get related products from the same category
-    related_products = Product.objects.filter(
-        category=product.category,
-        available=True
-    ).exclude(id=product.id)[:4]
+    related_products = cached_catalog('related_products', (product.pk,), lambda: list(
+        Product.objects.filter(
+            category=product.category,
+            available=True
+        ).exclude(id=product.id)[:4]
+    ))
     
     return render(request, 'store/product_detail.html', {
         'product': product,
         'related_products': related_products
     })
 
-def get_or_create_cart(request):
-    """Helper function to get the current user's cart or create a new one."""
-    if request.user.is_authenticated:
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        # Merge session cart if exists
-        session_cart_id = request.session.get('cart_id')
-        if session_cart_id and created:
-            try:
-                session_cart = Cart.objects.get(id=session_cart_id, user=None)
-                # Move items from session cart to user cart
-                for item in session_cart.items.all():
-                    try:
-                        existing_item = CartItem.objects.get(cart=cart, product=item.product)
-                        existing_item.quantity += item.quantity
-                        existing_item.save()
-                    except CartItem.DoesNotExist:
-                        item.cart = cart
-                        item.save()
-                session_cart.delete()
-                del request.session['cart_id']
-            except Cart.DoesNotExist:
-                pass
-    else:
-        # For anonymous users, use session-based cart
-        cart_id = request.session.get('cart_id')
-        if cart_id:
-            try:
-                cart = Cart.objects.get(id=cart_id, user=None)
-            except Cart.DoesNotExist:
-                cart = Cart.objects.create()
-                request.session['cart_id'] = cart.id
-        else:
-            cart = Cart.objects.create()
-            request.session['cart_id'] = cart.id
-    
+def prefetch_cart_items(cart):
+    """Load the cart's items and their products in a single query."""
+    if cart.pk is None:
+        return cart
+    prefetch_related_objects(
+        [cart], Prefetch('items', queryset=CartItem.objects.select_related('product__category'))
+    )
     return cart
 
 @require_POST
+# Product, session, user and cart lookups, BEGIN + INSERT for a user's first
+# cart, then BEGIN, the reservation (3-4), the cart line upsert (2) and the
+# summary refresh (2). An anonymous visitor's first add stays under this: its
+# cart INSERT needs no BEGIN and the session is saved after the view.
+@query_budget(15)
 def cart_add(request, product_id):
     """Add a product to the shopping cart."""
     product = get_object_or_404(Product, id=product_id)
-    cart = get_or_create_cart(request)
+    cart = get_cart(request, create=True)
     quantity = int(request.POST.get('quantity', 1))
     
-    # Check if the product is already in the cart
+    # Negative quantities decrement the line (used by the cart page's -/+ buttons)
     try:
-        cart_item = CartItem.objects.get(cart=cart, product=product)
-        cart_item.quantity += quantity
-        cart_item.save()
-    except CartItem.DoesNotExist:
-        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+        if quantity > 0:
+            add_item(cart, product, quantity)
+        elif quantity < 0:
+            remove_item(cart, product, -quantity)
+    except OutOfStock as exc:
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'success': False, 'message': str(exc)})
+        messages.error(request, str(exc))
+        return redirect(product.get_absolute_url())
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-        cart_count = sum(item.quantity for item in cart.items.all())
         return JsonResponse({
             'success': True,
             'message': f'{product.name} added to your cart.',
-            'cart_count': cart_count,
+            'cart_count': cart.get_total_quantity(),
             'cart_total': float(cart.get_total_cost())
         })
     
     messages.success(request, f'{product.name} added to your cart.')
     return redirect('store:cart_detail')
 
+# Product, session, user and cart lookups, then BEGIN, the line update or
+# delete (1-2), the stock release (3) and the summary refresh (2).
+@query_budget(12)
 def cart_remove(request, product_id):
     """Remove a product from the shopping cart."""
     product = get_object_or_404(Product, id=product_id)
-    cart = get_or_create_cart(request)
+    cart = request.cart
     
-    try:
-        cart_item = CartItem.objects.get(cart=cart, product=product)
-        if cart_item.quantity > 1:
-            cart_item.quantity -= 1
-            cart_item.save()
-        else:
-            cart_item.delete()
-        
+    if cart.pk and remove_item(cart, product):
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            cart_count = sum(item.quantity for item in cart.items.all())
             return JsonResponse({
                 'success': True,
                 'message': f'Removed {product.name} from your cart.',
-                'cart_count': cart_count,
+                'cart_count': cart.get_total_quantity(),
                 'cart_total': float(cart.get_total_cost())
             })
         
         messages.success(request, f'Removed {product.name} from your cart.')
-    except CartItem.DoesNotExist:
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'success': False, 'message': 'Item not found in cart.'})
+    elif request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({'success': False, 'message': 'Item not found in cart.'})
     
     return redirect('store:cart_detail')
 
+@query_budget(8)
 def cart_detail(request):
     """Display the contents of the shopping cart."""
-    cart = get_or_create_cart(request)
+    cart = prefetch_cart_items(request.cart)
     return render(request, 'store/cart_detail.html', {'cart': cart})
 
-@login_required
 @login_required
 def checkout(request):
     """Process the checkout and create an order."""
-    cart = get_or_create_cart(request)
+    cart = request.cart
     
-    if not cart.items.exists():
+    if not cart.item_count:
         messages.warning(request, 'Your cart is empty.')
         return redirect('store:cart_detail')
     
     if request.method == 'POST':
         form = CheckoutForm(request.POST)
         if form.is_valid():
-            # Process the order
-            order = Order.objects.create(
-                user=request.user,
-                first_name=form.cleaned_data['first_name'],
-                last_name=form.cleaned_data['last_name'],
-                email=form.cleaned_data['email'],
-                address=form.cleaned_data['address'],
-                postal_code=form.cleaned_data['postal_code'],
-                city=form.cleaned_data['city']
-            )
-            
-            for item in cart.items.all():
-                OrderItem.objects.create(
-                    order=order,
-                    product=item.product,
-                    price=item.product.price,
-                    quantity=item.quantity
-                )
-            
-            # Clear the cart
-            cart.items.all().delete()
+            try:
+                place_order(cart, request.user, form.cleaned_data)
+            except CheckoutError as exc:
+                messages.error(request, str(exc))
+                return redirect('store:cart_detail')
             
             messages.success(request, 'Your order has been placed successfully!')
             return redirect('store:order_confirmation')
@@ -203,7 +247,7 @@ def checkout(request):
             'email': request.user.email
         })
     
-    return render(request, 'store/checkout.html', {'cart': cart, 'form': form})
+    return render(request, 'store/checkout.html', {'cart': prefetch_cart_items(cart), 'form': form})
 
 @login_required
 def order_confirmation(request):
@@ -211,15 +255,54 @@ def order_confirmation(request):
     return render(request, 'store/order_confirmation.html')
 
 # API Views
+@query_budget(6)
+@read_replica
+@conditional(api_products_validators)
 def api_products(request):
-    """API endpoint for products."""
-    products = Product.objects.filter(available=True)
-    category_slug = request.GET.get('category')
+    """
+    API endpoint for products.
     
-    if category_slug:
-        category = get_object_or_404(Category, slug=category_slug)
-        products = products.filter(category=category)
+    Results are cursor-paginated: follow ``next``/``previous`` to walk the
+    catalog. Filter with ``category`` and ``price`` (both repeatable) and
+    ``in_stock=1``; pass ``facets=1`` to include facet counts and
+    ``total=1`` to include a (bounded) estimated total.
+    """
+    categories = category_list()
+    filters = FacetFilters.from_request(request, categories)
+    category_ids = filters.category_ids(categories)
+    sort_by = request.GET.get('sort', 'name')
+    if sort_by not in SORT_ORDERINGS or sort_by == 'relevance':
+        sort_by = 'name'
+    cursor = request.GET.get('cursor')
+    page_size = get_page_size(request)
+    include_total = request.GET.get('total') in ('1', 'true')
+    include_facets = request.GET.get('facets') in ('1', 'true')
+    
+    try:
+        data = cached_catalog(
+            'api_products',
+            (sort_by, cursor, page_size, include_total, *filters.cache_parts),
+            lambda: _api_products_data(category_ids, filters, sort_by, cursor, page_size, include_total),
+            stock_cache_timeout() if filters.in_stock else None,
+        )
+    except InvalidCursor as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    if include_facets:
+        data = {**data, 'facets': build_facets(facet_rows('', filters), categories, filters, category_ids)}
+    return JsonResponse(data)
+
+def _api_products_data(category_ids, filters, sort_by, cursor, page_size, include_total):
+    """Build one page of the products API payload (cached by ``api_products``)."""
+    products = filters.apply(Product.objects.filter(available=True).select_related('category'), category_ids)
     
+    paginator = KeysetPaginator(products, SORT_ORDERINGS[sort_by], page_size)
+    data = api_products_payload(paginator.get_page(cursor), page_size)
+    if include_total:
+        data['total'], data['total_is_exact'] = estimate_count(products)
+    return data
+
+def api_products_payload(page, page_size):
+    """Serialize one ``KeysetPage`` of products for the products API."""
     products_data = [{
         'id': p.id,
         'name': p.name,
@@ -228,29 +311,62 @@ def api_products(request):
         'description': p.description,
         'image': p.image.url if p.image else None,
         'category': p.category.name
-    } for p in products]
+    } for p in page]
     
-    return JsonResponse({
+    return {
         'products': products_data,
-        'total': products.count()
-    })
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+        'page_size': page_size,
+    }
+
+@query_budget(2)
+def api_products_export(request):
+    """
+    Stream every available product for full catalog syncs.
+    
+    ``format=ndjson`` (default) emits one JSON object per line; ``format=json``
+    emits a single JSON array. Rows are streamed as they are read, so the
+    response starts immediately and memory stays flat for any catalog size.
+    """
+    fmt = request.GET.get('format', 'ndjson')
+    if fmt not in CONTENT_TYPES:
+        return JsonResponse({'error': f'Unsupported format: {fmt}'}, status=400)
+    
+    category = None
+    category_slug = request.GET.get('category')
+    if category_slug:
+        category = get_object_or_404(Category, slug=category_slug)
+    
+    response = StreamingHttpResponse(stream_export(export_rows(category), fmt), content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="catalog.{fmt}"'
+    # Ask proxies such as nginx to pass chunks through instead of buffering the body
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 def api_cart_status(request):
-    """API endpoint for cart status."""
-    cart = get_or_create_cart(request)
-    cart_items = [{
-        'id': item.id,
-        'product_name': item.product.name,
-        'product_price': float(item.product.price),
-        'quantity': item.quantity,
-        'total': float(item.get_cost())
-    } for item in cart.items.all()]
+    """
+    API endpoint for cart status.
     
-    return JsonResponse({
-        'cart_items': cart_items,
-        'cart_count': sum(item.quantity for item in cart.items.all()),
+    Pass ``summary=1`` to get only the count and total, which are read from
+    the cart row without loading its items.
+    """
+    cart = request.cart
+    data = {
+        'cart_count': cart.get_total_quantity(),
         'cart_total': float(cart.get_total_cost())
-    })
+    }
+    if request.GET.get('summary') not in ('1', 'true'):
+        items = cart.items.select_related('product') if cart.pk else []
+        data['cart_items'] = [{
+            'id': item.id,
+            'product_name': item.product.name,
+            'product_price': float(item.product.price),
+            'quantity': item.quantity,
+            'total': float(item.get_cost())
+        } for item in items]
+    
+    return JsonResponse(data)
 
 def about(request):
     """Display the about page."""
@@ -264,8 +380,8 @@ def contact(request):
         subject = request.POST.get('subject')
         message = request.POST.get('message')
         
-        # Here you can add email sending logic or save to database
-        # For now, we'll just show a success message
+        # Sent by the task worker so the visitor doesn't wait on the mail server
+        send_contact_message.delay(name, email, subject, message)
         messages.success(request, f'Thank you {name}! Your message has been sent successfully. We will get back to you soon.')
         return redirect('store:contact')
     
@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from tasks.models import Task
+from tasks.worker import Worker
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (keep one or more of these running alongside the web server)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no task is due instead of polling')
+        parser.add_argument('--batch-size', type=int, default=10, help='Tasks claimed per poll')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Size of the process pool for CPU-bound tasks (default: CPU count)')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--stale-minutes', type=int, default=10,
+                            help='Re-queue tasks left running this long by a worker that died')
+        parser.add_argument('--purge-days', type=int, default=7,
+                            help='Delete finished tasks older than this many days (0 keeps them)')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            batch_size=options['batch_size'],
+            processes=options['processes'],
+            stale_after=timedelta(minutes=options['stale_minutes']),
+        )
+        self.stdout.write(f'Worker {worker.id} started.')
+        processed = 0
+        last_housekeeping = None
+        try:
+            while True:
+                if last_housekeeping is None or time.monotonic() - last_housekeeping > 60:
+                    self.housekeeping(worker, options['purge_days'])
+                    last_housekeeping = time.monotonic()
+                ran = worker.run_batch()
+                processed += ran
+                close_old_connections()
+                if not ran:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} tasks.'))
+
+    def housekeeping(self, worker, purge_days):
+        requeued = worker.requeue_stale()
+        if requeued:
+            self.stdout.write(f'Re-queued {requeued} stale tasks.')
+        if purge_days:
+            Task.objects.filter(
+                status=Task.DONE, finished_at__lt=timezone.now() - timedelta(days=purge_days)
+            ).delete()
@@ -0,0 +1,20 @@
+"""
+Entry points for the worker's process pool.
+
+Kept free of model imports: spawned children unpickle these functions
+before Django is set up, and only then load the apps and their tasks.
+"""
+import django
+
+
+def init_process():
+    django.setup()
+
+
+def run_in_process(name, args, kwargs):
+    from django.db import close_old_connections
+    from .queue import get_task
+    try:
+        get_task(name).func(*args, **kwargs)
+    finally:
+        close_old_connections()
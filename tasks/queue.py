@@ -0,0 +1,101 @@
+"""
+A small database-backed task queue.
+
+Decorate a function in an app's ``tasks.py`` with ``@task`` and call
+``.delay(*args, **kwargs)`` instead of calling it::
+
+    @task(max_attempts=5)
+    def send_order_confirmation(order_id):
+        ...
+
+    send_order_confirmation.delay(order.pk)
+
+``delay`` stores a ``Task`` row, so a task enqueued inside a transaction is
+only visible to workers once that transaction commits, and is dropped if it
+rolls back. ``python manage.py run_tasks`` executes queued tasks, retrying
+failures with exponential backoff; tasks declared ``cpu_bound=True`` run in
+a process pool so they do not hold up the others.
+
+Arguments must be JSON-serializable; pass primary keys, not model instances.
+With ``TASKS['EAGER']`` set, tasks run in-process right after the current
+transaction commits instead (handy in development without a worker).
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'EAGER': False,
+    # Seconds before the first retry; doubled on every further attempt.
+    'RETRY_DELAY': 30,
+    'MAX_RETRY_DELAY': 60 * 60,
+}
+
+registry = {}
+
+
+def get_setting(name):
+    return getattr(settings, 'TASKS', {}).get(name, DEFAULTS[name])
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt after ``attempts`` failed ones."""
+    return timedelta(seconds=min(get_setting('RETRY_DELAY') * 2 ** (attempts - 1), get_setting('MAX_RETRY_DELAY')))
+
+
+class TaskFunction:
+    def __init__(self, func, name, max_attempts, cpu_bound):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.cpu_bound = cpu_bound
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<task {self.name}>'
+
+    def delay(self, *args, **kwargs):
+        """Queue a call with these arguments."""
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, countdown=None):
+        kwargs = kwargs or {}
+        if get_setting('EAGER'):
+            transaction.on_commit(lambda: self._run_eagerly(args, kwargs))
+            return None
+
+        from .models import Task
+        run_at = timezone.now() + timedelta(seconds=countdown) if countdown else timezone.now()
+        return Task.objects.create(
+            name=self.name, args=list(args), kwargs=kwargs, max_attempts=self.max_attempts, run_at=run_at
+        )
+
+    def _run_eagerly(self, args, kwargs):
+        try:
+            self.func(*args, **kwargs)
+        except Exception:
+            logger.exception('Task %s failed', self.name)
+
+
+def task(func=None, *, name=None, max_attempts=3, cpu_bound=False):
+    """Register ``func`` as a task; usable as ``@task`` or ``@task(...)``."""
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        registry[task_name] = TaskFunction(func, task_name, max_attempts, cpu_bound)
+        return registry[task_name]
+    return decorator(func) if func is not None else decorator
+
+
+def get_task(name):
+    try:
+        return registry[name]
+    except KeyError:
+        raise LookupError(f'No task named {name!r} is registered.') from None
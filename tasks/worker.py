@@ -0,0 +1,113 @@
+"""
+Task execution for ``python manage.py run_tasks``.
+
+Workers claim due tasks with a conditional ``UPDATE ... WHERE status =
+'queued'``, so several workers (on any database backend) can poll the same
+table without running a task twice. Tasks left ``running`` by a worker that
+died are re-queued once their lock is older than ``stale_after``.
+"""
+import multiprocessing
+import os
+import socket
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Task
+from .process import init_process, run_in_process
+from .queue import get_task, retry_delay
+
+
+class Worker:
+    def __init__(self, batch_size=10, processes=None, stale_after=timedelta(minutes=10)):
+        self.id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.batch_size = batch_size
+        self.processes = processes
+        self.stale_after = stale_after
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            # spawn, not fork: forked children would share the parent's database connections.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_process,
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def requeue_stale(self):
+        return Task.objects.filter(
+            status=Task.RUNNING, locked_at__lt=timezone.now() - self.stale_after
+        ).update(status=Task.QUEUED, locked_by='', locked_at=None)
+
+    def claim(self):
+        """Lock up to ``batch_size`` due tasks for this worker and return them."""
+        now = timezone.now()
+        ids = list(
+            Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+            .order_by('run_at')
+            .values_list('pk', flat=True)[:self.batch_size]
+        )
+        if not ids:
+            return []
+        # Only rows still queued are claimed; another worker may have won some.
+        Task.objects.filter(pk__in=ids, status=Task.QUEUED).update(
+            status=Task.RUNNING, locked_by=self.id, locked_at=now
+        )
+        return list(Task.objects.filter(pk__in=ids, status=Task.RUNNING, locked_by=self.id))
+
+    def run_batch(self):
+        """Run one batch of due tasks; returns the number of tasks run."""
+        tasks = self.claim()
+        futures = {}
+        for task in tasks:
+            try:
+                func = get_task(task.name)
+            except LookupError as exc:
+                self.finish(task, error=str(exc), retry=False)
+                continue
+            if func.cpu_bound:
+                futures[task] = self.pool.submit(run_in_process, task.name, task.args, task.kwargs)
+                continue
+            try:
+                func.func(*task.args, **task.kwargs)
+            except Exception:
+                self.finish(task, error=traceback.format_exc())
+            else:
+                self.finish(task)
+
+        for task, future in futures.items():
+            try:
+                future.result()
+            except Exception:
+                self.finish(task, error=traceback.format_exc())
+            else:
+                self.finish(task)
+        return len(tasks)
+
+    def finish(self, task, error=None, retry=True):
+        task.attempts += 1
+        task.locked_by = ''
+        task.locked_at = None
+        if error is None:
+            task.status = Task.DONE
+            task.finished_at = timezone.now()
+        elif retry and task.attempts < task.max_attempts:
+            task.status = Task.QUEUED
+            task.run_at = timezone.now() + retry_delay(task.attempts)
+            task.last_error = error
+        else:
+            task.status = Task.FAILED
+            task.finished_at = timezone.now()
+            task.last_error = error
+        task.save(update_fields=['attempts', 'locked_by', 'locked_at', 'status', 'run_at', 'finished_at', 'last_error'])
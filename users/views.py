@@ -1,7 +1,10 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from store.models import Order
+from django.db.models import Prefetch
+from ecommerce_project.routers import read_replica
+from store.models import Order, OrderItem
+from store.queries import query_budget
 
 @login_required
 def profile(request):
@@ -20,7 +23,11 @@ def profile(request):
     return render(request, 'users/profile.html')
 
 @login_required
+@query_budget(8)
+@read_replica
 def order_history(request):
     """Display user's order history."""
-    orders = Order.objects.filter(user=request.user).order_by('-created')
+    orders = Order.objects.with_totals().filter(user=request.user).order_by('-created').prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+    )
     return render(request, 'users/order_history.html', {'orders': orders})
\ No newline at end of file